@@ -4,7 +4,7 @@
         
         This method should be used when you want to display a token to a user.
         
-        For highest precision, the implementation is made using only str.
+        For highest precision, the implementation is made using only int.
 
         :param amount: The integer amount that you want to convert
         :type amount: int
@@ -22,22 +22,20 @@
         ```
         :rtype: str
         """
-        str_amount = str(amount)
-
         # special case when decimals is 0
         if decimals == 0:
-            return str_amount
-
-        # Check if the string length is less than the decimals
-        if len(str_amount) <= decimals:
-            # Add leading zeros to the string
-            str_amount = '0' * (decimals - len(str_amount) + 1) + str_amount
-            
-        # Insert the decimal point at the correct position
-        str_amount = str_amount[:-decimals] + "." + str_amount[-decimals:]
-        
-        str_amount = str_amount.rstrip('0').rstrip('.') if '.' in str_amount else str_amount
-        return str_amount
+            return str(amount)
+
+        # Split the amount in one bignum operation instead of padding and
+        # slicing intermediate strings. 18 decimals is by far the most
+        # common case so it bypasses the helper call entirely
+        integer_part, fractional_part = divmod(amount, _POW18 if decimals == 18 else _pow10(decimals))
+
+        str_amount = f"{integer_part}.{fractional_part:0{decimals}d}"
+
+        # The precompiled regex removes the trailing zeros (and the dot when
+        # nothing is left after it) in a single pass
+        return _TRAILING_ZEROS.sub('', str_amount)
 
     def get_token_unsigned_form(self, amount: str, decimals: int) -> int:
         """Convert a token from his decimal form back to his unsigned integer form (this
@@ -46,7 +44,7 @@
         This method should be used when you receive an amount from a user, in order to convert his
         input.
 
-        For the highest precision, the implementation only uses str
+        For the highest precision, the implementation only uses int
 
         :param amount: The amount in str format that you want to convert
         :type amount: str
@@ -63,21 +61,51 @@
         ```
         :rtype: int
         """
-        split = amount.split('.')
-        if len(split) >= 2:
-            integer_part, fractional_part = split
-        else:
-            integer_part, fractional_part = split[0], ""
-
-        # Check if the fractional part has less digits than the decimal places
-        if len(fractional_part) < decimals:
-            # Append zeros to the end of the fractional part
-            fractional_part += '0' * (decimals - len(fractional_part))
-        else:
-            # Trim the fractional part to the number of decimal places
-            fractional_part = fractional_part[:decimals]
-
-        # Combine the integer and fractional parts and convert to an integer
-        integer_token_amount = int(integer_part + fractional_part)
-
-        return integer_token_amount
+        # When the input has no fractional part we skip the split entirely
+        if '.' not in amount:
+            return int(amount) * _pow10(decimals)
+
+        integer_part, _, fractional_part = amount.partition('.')
+
+        # Trim the fractional part to the number of decimal places
+        fractional_part = fractional_part[:decimals]
+
+        # The missing decimal places are restored with a single multiply by a
+        # cached power of ten instead of padding the string with zeros
+        return int(integer_part + fractional_part) * _pow10(decimals - len(fractional_part))
+
+
+import re
+
+from functools import lru_cache
+
+_TRAILING_ZEROS = re.compile(r"\.?0+$")
+"""Matches the trailing zeros of a decimal form, dot included when the
+fractional part is only made of zeros.
+
+Compiled once at import time since the pattern never changes.
+"""
+
+_POW10 = tuple(10 ** k for k in range(78))
+"""The powers of ten up to the size of a uint256 token amount.
+
+The table is built once at import time so that a conversion is a single
+lookup instead of a pow call.
+"""
+
+_POW18 = _POW10[18]
+"""10**18 bound to its own name because almost every token has 18 decimals"""
+
+@lru_cache
+def _pow10(decimals: int) -> int:
+    """Get 10 raised to the power of decimals.
+
+    The result is cached because tokens almost always have the same
+    amount of decimals (usually 18), so we compute the power only once.
+
+    :param decimals: The amount of decimals of the token
+    :type decimals: int
+    :return: 10**decimals
+    :rtype: int
+    """
+    return _POW10[decimals] if decimals < len(_POW10) else 10 ** decimals
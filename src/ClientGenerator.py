@@ -1,10 +1,12 @@
 import json
 import os
+import stat
 import sys
 
 import yaml
 
 from argparse import Namespace
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict
 
 from src.ConfigType import ConfigType
@@ -15,21 +17,112 @@ from src.generators.MainClassGenerator import MainClassGenerator
 from src.generators.ModelGenerator import ModelGenerator
 from src.generators.TestGenerator import TestGenerator
 
-from src.generators.generator_types import Schema
+from src.generators.generator_types import OpenAPI, Schema
 
 
-from yaml.loader import SafeLoader
+try:
+    # The libyaml loader parses the config way faster than the pure-Python one
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml.loader import SafeLoader
+
+_parsed_config_cache: Dict[tuple, ConfigType] = {}
+"""The parsed config files keyed by (path, mtime, size).
+
+When several clients are generated inside the same process, each config
+file is parsed a single time as long as it did not change on disk.
+"""
+
+_parsed_open_api_cache: Dict[tuple, OpenAPI] = {}
+"""The parsed OpenAPI files, keyed like _parsed_config_cache"""
+
+def _cache_key(path: str) -> tuple:
+    """Build the cache key of the file at the given path.
+
+    The key contains the mtime and size, so an edited file is parsed
+    again instead of being served stale from the cache.
+
+    :param path: The path to the file
+    :type path: str
+    :return: The key to use in the parse caches
+    :rtype: tuple
+    """
+    file_stat = os.stat(path)
+    return (path, file_stat.st_mtime_ns, file_stat.st_size)
 
 def _parse_config(config_path: str) -> ConfigType:
     """Parse the config file
 
     :param config_path: The path to the config file
     :type config_path: str
-    :return: The config file parsed as dictionary
+    :return: The config file parsed as a frozen dataclass
     :rtype: ConfigType
     """
-    with open(config_path, "r") as f:
-        return yaml.load(f, Loader=SafeLoader)
+    key = _cache_key(config_path)
+    config = _parsed_config_cache.get(key)
+    if config is None:
+        # The whole file is handed to the loader at once: libyaml then scans
+        # a single buffer instead of pulling chunks through the text stream
+        with open(config_path, "rb") as f:
+            config = _parsed_config_cache[key] = ConfigType.from_dict(yaml.load(f.read(), Loader=SafeLoader))
+    return config
+
+def _parse_open_api(open_api_file_path: str) -> OpenAPI:
+    """Parse the OpenAPI json file
+
+    :param open_api_file_path: The path to the OpenAPI file
+    :type open_api_file_path: str
+    :return: The parsed OpenAPI file
+    :rtype: OpenAPI
+    """
+    key = _cache_key(open_api_file_path)
+    open_api_file = _parsed_open_api_cache.get(key)
+    if open_api_file is None:
+        # Reading the raw bytes in one gulp and handing them to json.loads
+        # skips the incremental decode of the buffered text reader
+        with open(open_api_file_path, "rb") as f:
+            open_api_file = _parsed_open_api_cache[key] = json.loads(f.read())
+    return open_api_file
+
+def _exit_with_error(message: str):
+    """Print the given error message and exit the program with an error code.
+
+    The message f-strings are only rendered inside the failing branch, so
+    the happy path never pays for their formatting.
+
+    :param message: The error message to print before exiting
+    :type message: str
+    """
+    print(message)
+    sys.exit(1)
+
+def _stat_mode(path: str) -> int:
+    """Get the stat mode bits of the given path, or 0 when the path
+    does not exist.
+
+    :param path: The path that we have to stat
+    :type path: str
+    :return: The st_mode of the path, 0 if the path does not exist
+    :rtype: int
+    """
+    try:
+        return os.stat(path).st_mode
+    except OSError:
+        return 0
+
+def _is_non_empty_dir(path: str) -> bool:
+    """Verify if the folder at the given path contains at least one entry.
+
+    We only pull the first entry out of os.scandir instead of building
+    the whole os.listdir list just to take its length.
+
+    :param path: The path to the folder
+    :type path: str
+    :return: `True` if the folder contains at least one entry, `False` otherwise
+    :rtype: bool
+    """
+    with os.scandir(path) as entries:
+        return next(entries, None) is not None
 
 class ClientGenerator:
     """Allow us to generate a client from an OpenAPI SDK.
@@ -38,7 +131,16 @@ class ClientGenerator:
         _open_api_file_path: The path to the OpenAPI file that we are willing to use
         _dest_folder: The destination folder of the generated client
     """
-    
+
+    __slots__ = ("_open_api_file_path", "_config", "_dest_folder", "_package_folder",
+                 "_models_folder", "_exceptions_folder", "_test_folder",
+                 "_main_class_generator", "_main_class_generator_sync",
+                 "_model_generator", "_test_generator", "_sync_test_generator",
+                 "_additional_generator")
+    """We declare the slots like the generated models do: attribute access
+    is faster and the instance does not carry a per-instance __dict__
+    """
+
     _open_api_file_path: str
     """The path to the targeted open API file. This file has to be valid, otherwise,
     the program will print an error
@@ -71,17 +173,19 @@ class ClientGenerator:
         config_file = arguments.config
         self._config = _parse_config(config_file)
         self._dest_folder = arguments.dest
-        self._package_folder = os.path.join(self._dest_folder, "src", self._config["package"]["name"])
-        self._models_folder = os.path.join(self._package_folder, "models")
-        self._exceptions_folder = os.path.join(self._package_folder, "exceptions")
-        self._test_folder = os.path.join(self._dest_folder, "tests")
-        self._main_class_generator = MainClassGenerator(self._config["name"], self._config["api-url"], self._package_folder, True)
-        self._main_class_generator_sync = MainClassGenerator(self._config["name"], self._config["api-url"], self._package_folder, False)
-        self._model_generator = ModelGenerator(self._config["name"], self._models_folder, self._exceptions_folder,
-                                               self._config["exception-module-description"],
-                                               self._config["model-module-description"])
-        self._test_generator = TestGenerator(self._config["name"], self._config["api-url"], self._test_folder, True, self._config["package"]["name"])
-        self._sync_test_generator = TestGenerator(self._config["name"], self._config["api-url"], self._test_folder, False, self._config["package"]["name"])
+        # The child folders are derived from the package folder with plain
+        # f-strings: one os.path.join builds the base and the others reuse it
+        self._package_folder = os.path.join(self._dest_folder, "src", self._config.package.name)
+        self._models_folder = f"{self._package_folder}{os.sep}models"
+        self._exceptions_folder = f"{self._package_folder}{os.sep}exceptions"
+        self._test_folder = f"{self._dest_folder}{os.sep}tests"
+        self._main_class_generator = MainClassGenerator(self._config.name, self._config.api_url, self._package_folder, True)
+        self._main_class_generator_sync = MainClassGenerator(self._config.name, self._config.api_url, self._package_folder, False)
+        self._model_generator = ModelGenerator(self._config.name, self._models_folder, self._exceptions_folder,
+                                               self._config.exception_module_description,
+                                               self._config.model_module_description)
+        self._test_generator = TestGenerator(self._config.name, self._config.api_url, self._test_folder, True, self._config.package.name)
+        self._sync_test_generator = TestGenerator(self._config.name, self._config.api_url, self._test_folder, False, self._config.package.name)
         self._additional_generator = AdditionalGenerator(arguments.additional, self._package_folder, self._test_folder)
 
     def _verify_args(self, arguments: Namespace):
@@ -99,33 +203,40 @@ class ClientGenerator:
         :param arguments: The program arguments that we have to verify
         :type arguments: Namespace
         """
-        if not os.path.isfile(arguments.file):
-            print(f"The file at path: {arguments.file} does not exist, please provide a valid input file")
-            sys.exit(1)
-        if os.path.isdir(arguments.dest) and len(os.listdir(arguments.dest)) > 0:
-            print(f"The destination folder: {arguments.dest} exist and is not empty. You must call the program with an empty or non-existant folder.")
-            sys.exit(1)
-        if os.path.isfile(arguments.dest):
-            print(f"The destination folder: {arguments.dest} is a file, it should be either an empty folder or not exist.")
-            sys.exit(1)
-        if not os.path.isfile(arguments.config):
-            print(f"The configuration file does not exits: {arguments.config}")
-            sys.exit(1)
+        # We stat each path a single time and look at the mode bits instead
+        # of chaining isfile/isdir calls that each stat the path again
+        if not stat.S_ISREG(_stat_mode(arguments.file)):
+            _exit_with_error(f"The file at path: {arguments.file} does not exist, please provide a valid input file")
+        dest_mode = _stat_mode(arguments.dest)
+        if stat.S_ISDIR(dest_mode) and _is_non_empty_dir(arguments.dest):
+            _exit_with_error(f"The destination folder: {arguments.dest} exist and is not empty. You must call the program with an empty or non-existant folder.")
+        if stat.S_ISREG(dest_mode):
+            _exit_with_error(f"The destination folder: {arguments.dest} is a file, it should be either an empty folder or not exist.")
+        if not stat.S_ISREG(_stat_mode(arguments.config)):
+            _exit_with_error(f"The configuration file does not exits: {arguments.config}")
 
     def _create_package_init_file(self):
-        with open(os.path.join(self._package_folder, "__init__.py"), "w+") as f:
-            f.write(f'''"""
-{self._config["package"]["description"]}
+        package = self._config.package
+        content = f'''"""
+{package.description}
 """
 
-{self._config["package"]["author-comment"]}__author__ = "{self._config["package"]["author"]}"
-__version__ = "{self._config["package"]["version"]}"
+{package.author_comment}__author__ = "{package.author}"
+__version__ = "{package.version}"
 
-''')
+'''
+        # The whole file is built as one f-string and flushed with a single
+        # os.write, skipping the buffered text layer for this one-shot write
+        fd = os.open(os.path.join(self._package_folder, "__init__.py"),
+                     os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            os.write(fd, content.encode())
+        finally:
+            os.close(fd)
 
     def _add_all_to_init(self):
         with open(os.path.join(self._package_folder, "__init__.py"), "a") as f:
-            f.write(f'\n__all__ = {self._config["package"]["all-exports"]}\n')
+            f.write(f'\n__all__ = {self._config.package.all_exports}\n')
 
     def _init_dest_folder(self):
         """Create the destination folder if not exist as well as the
@@ -136,31 +247,46 @@ __version__ = "{self._config["package"]["version"]}"
         if not os.path.exists(self._dest_folder):
             parent = os.path.dirname(self._dest_folder)
             if parent and not os.path.exists(parent):
-                print(f"Error: parent directory of the specified destination: {parent} does not exist. Can't create output file")
-                sys.exit(1)
-            os.mkdir(self._dest_folder)
+                _exit_with_error(f"Error: parent directory of the specified destination: {parent} does not exist. Can't create output file")
 
-        os.mkdir(os.path.join(self._dest_folder, "src"))
-        os.mkdir(os.path.join(self._dest_folder, "src", self._config["package"]["name"]))
-        os.mkdir(self._models_folder)
-        os.mkdir(self._exceptions_folder)
-        os.mkdir(self._test_folder)
+        # makedirs creates every missing intermediate folder, so the whole
+        # dest/src/<package> chain is built in one call instead of one mkdir
+        # per level
+        os.makedirs(self._models_folder, exist_ok=True)
+        os.makedirs(self._exceptions_folder, exist_ok=True)
+        os.makedirs(self._test_folder, exist_ok=True)
 
     def create_client(self):
         """Generate the python client from the arguments given
         """
-        with open(self._open_api_file_path, "r") as f:
-            open_api_file = json.load(f)
+        open_api_file = _parse_open_api(self._open_api_file_path)
+        # We extract the subtrees once so that every generator works on the
+        # same already-parsed dictionaries
+        paths = open_api_file["paths"]
+        schemas: Dict[str, Schema] = open_api_file["components"]["schemas"]
         self._init_dest_folder()
         create_requirements(self._dest_folder)
         create_gitignore(self._dest_folder)
         self._create_package_init_file()
-        self._main_class_generator.generate_main_class(open_api_file)
-        self._main_class_generator_sync.generate_main_class(open_api_file)
-        schemas: Dict[str, Schema] = open_api_file["components"]["schemas"]
+        # The async and sync main classes and the two test suites are built
+        # from the same parsed spec but write to disjoint files, so the four
+        # generations run in parallel. Threads fit better than processes
+        # here: the generators share the parsed spec without pickling and
+        # most of their time is file I/O
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = [
+                executor.submit(self._main_class_generator.generate_main_class, open_api_file),
+                executor.submit(self._main_class_generator_sync.generate_main_class, open_api_file),
+                executor.submit(self._test_generator.generate_tests, paths),
+                executor.submit(self._sync_test_generator.generate_tests, paths),
+            ]
+            for future in futures:
+                future.result()
+        # The exports are appended sequentially to keep the package
+        # __init__.py deterministic
+        self._main_class_generator.add_export_to_package()
+        self._main_class_generator_sync.add_export_to_package()
         self._model_generator.build_models(schemas)
-        self._test_generator.generate_tests(open_api_file["paths"])
-        self._sync_test_generator.generate_tests(open_api_file["paths"])
         self._add_all_to_init()
         # Once we finish we append the additional
         self._additional_generator.append_additional()
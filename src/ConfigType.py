@@ -1,18 +1,77 @@
-from typing import List, TypedDict
-
-PackageType = TypedDict("PackageType", {
-    "name": str,
-    "author": str,
-    "author-comment": str,
-    "version": str,
-    "description": str,
-    "all-exports": List[str]
-})
-
-ConfigType = TypedDict("ConfigType", {
-    "name": str,
-    "api-url": str,
-    "package": PackageType,
-    "model-module-description": str,
-    "exception-module-description": str
-})
+from dataclasses import dataclass
+from typing import Any, Dict, List
+
+
+@dataclass(slots=True, frozen=True)
+class PackageType:
+    """The "package" section of the configuration file"""
+
+    name: str
+    """The name of the generated package"""
+
+    author: str
+    """The author of the generated package"""
+
+    author_comment: str
+    """The comment that is written above the __author__ assignment"""
+
+    version: str
+    """The version of the generated package"""
+
+    description: str
+    """The description of the generated package"""
+
+    all_exports: List[str]
+    """The modules that are exported when someone writes: from package import *"""
+
+
+@dataclass(slots=True, frozen=True)
+class ConfigType:
+    """The parsed configuration file.
+
+    We use a frozen dataclass with slots instead of a plain dictionary
+    because the config is read everywhere during the generation: the
+    attribute access is faster than a dictionary lookup and the config
+    can't be modified by mistake.
+    """
+
+    name: str
+    """The name of the API main class"""
+
+    api_url: str
+    """The url of the API"""
+
+    package: PackageType
+    """The config of the generated package"""
+
+    model_module_description: str
+    """The description written inside of the models __init__.py"""
+
+    exception_module_description: str
+    """The description written inside of the exceptions __init__.py"""
+
+    @staticmethod
+    def from_dict(raw: Dict[str, Any]) -> "ConfigType":
+        """Create a ConfigType from the dictionary parsed from the YAML
+        config file
+
+        :param raw: The dictionary parsed from the config file
+        :type raw: Dict[str, Any]
+        :return: The config as a frozen dataclass
+        :rtype: ConfigType
+        """
+        package = raw["package"]
+        return ConfigType(
+            name=raw["name"],
+            api_url=raw["api-url"],
+            package=PackageType(
+                name=package["name"],
+                author=package["author"],
+                author_comment=package["author-comment"],
+                version=package["version"],
+                description=package["description"],
+                all_exports=package["all-exports"]
+            ),
+            model_module_description=raw["model-module-description"],
+            exception_module_description=raw["exception-module-description"]
+        )
@@ -1,4 +1,65 @@
 import os
+import shutil
+
+from concurrent.futures import ThreadPoolExecutor
+
+_TEST_DIR_NAMES = frozenset({"tests"})
+"""The folder names whose content goes to the test folder instead of
+the package folder
+"""
+
+def _slurp_bytes(path: str) -> bytes:
+    """Read the whole file at the given path with a single os.read.
+
+    The file size comes from fstat so the read happens in one syscall,
+    without the BufferedReader layer of a regular open.
+
+    :param path: The path of the file to read
+    :type path: str
+    :return: The raw content of the file
+    :rtype: bytes
+    """
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        return os.read(fd, os.fstat(fd).st_size)
+    finally:
+        os.close(fd)
+
+def _append_file_contents(src_path: str, dest_path: str):
+    """Append the whole content of src_path to the end of dest_path.
+
+    On Linux the bytes are copied kernel-side with os.sendfile so they
+    never go through a user-space buffer. When sendfile is missing or
+    refuses the file pair we fall back to shutil.copyfileobj.
+
+    :param src_path: The path of the file to read
+    :type src_path: str
+    :param dest_path: The path of the file to append to
+    :type dest_path: str
+    """
+    src_fd = os.open(src_path, os.O_RDONLY)
+    try:
+        dest_fd = os.open(dest_path, os.O_WRONLY | os.O_CREAT, 0o644)
+        try:
+            # sendfile does not accept O_APPEND destinations, so we seek to
+            # the end ourselves
+            os.lseek(dest_fd, 0, os.SEEK_END)
+            size = os.fstat(src_fd).st_size
+            offset = 0
+            try:
+                while offset < size:
+                    sent = os.sendfile(dest_fd, src_fd, offset, size - offset)
+                    if sent == 0:
+                        break
+                    offset += sent
+            except (AttributeError, OSError):
+                with open(src_path, "rb") as src, open(dest_path, "ab") as dest:
+                    src.seek(offset)
+                    shutil.copyfileobj(src, dest)
+        finally:
+            os.close(dest_fd)
+    finally:
+        os.close(src_fd)
 
 class AdditionalGenerator:
     """Append the code inside of the additional folder to the destination folder
@@ -10,43 +71,93 @@ class AdditionalGenerator:
     
     _additional_folder: str
     _api_folder: str
-    
+    _known_dest_dirs: set
+    _open_appends: dict
+
     def __init__(self, additional_folder: str, api_folder: str, test_folder: str):
         self._additional_folder = additional_folder
         self._api_folder = api_folder
         self._test_folder = test_folder
+        self._known_dest_dirs = set()
+        self._open_appends = {}
 
     def _append_tests_from_folder(self, curr_path: str):
-        for test in os.listdir(curr_path):
-            test_path = os.path.join(curr_path, test)
-            with open(test_path, "r") as f:
-                content = f.read()
-            with open(os.path.join(self._test_folder, test), "a+") as f:
-                f.write(content)
-
-    def _append_additional_rec(self, curr_path: str, curr_dest_path: str, file_folder: str):
-        curr_path = os.path.join(curr_path, file_folder)
-        curr_dest_path = os.path.join(curr_dest_path, file_folder)
-        if os.path.isdir(curr_path):
-            if not os.path.isdir(curr_dest_path):
-                os.mkdir(curr_dest_path)
-            elif os.path.isfile(curr_dest_path):
-                raise Exception(f"Destination path: {curr_dest_path} is a file it should be a folder or not exist")
-
-            for file_in_folder in os.listdir(curr_path):
-                if file_in_folder == "tests":
-                    self._append_tests_from_folder(os.path.join(curr_path, file_in_folder))
+        # The DirEntry objects carry the file type from the directory read
+        # itself, so is_file does not cost an extra stat per test
+        with os.scandir(curr_path) as tests:
+            for test in tests:
+                if not test.is_file(follow_symlinks=False):
+                    continue
+                content = _slurp_bytes(test.path)
+                dest_path = os.path.join(self._test_folder, test.name)
+                # Append descriptors are cached per destination so a test
+                # file that receives several fragments is opened only once;
+                # they are all closed at the end of append_additional.
+                # O_APPEND makes each os.write land atomically at the end of
+                # the file with no Python-level buffering in between
+                fd = self._open_appends.get(dest_path)
+                if fd is None:
+                    fd = self._open_appends[dest_path] = os.open(dest_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+                os.write(fd, content)
+
+    def _append_additional_walk(self):
+        """Walk the additional folder iteratively and append every file
+        to its destination.
+
+        os.walk replaces the old Python recursion: no recursive frames,
+        and the per-directory work (destination path computation and
+        creation) happens once per folder instead of once per entry. The
+        special "tests" folders are pruned from the descent since their
+        content goes to the test folder instead of the package folder.
+        """
+        # First pass: walk the tree once, dispatch the test folders and
+        # collect the copy work per directory
+        copy_batches = []
+        for dirpath, dirnames, filenames in os.walk(self._additional_folder):
+            # One pass over the child folders both dispatches the test
+            # folders and prunes them from the descent, instead of a
+            # list membership scan followed by a remove scan
+            kept_dirs = []
+            for name in dirnames:
+                if name in _TEST_DIR_NAMES:
+                    self._append_tests_from_folder(dirpath + os.sep + name)
                 else:
-                    self._append_additional_rec(curr_path, curr_dest_path, file_in_folder)
+                    kept_dirs.append(name)
+            dirnames[:] = kept_dirs
+            rel = os.path.relpath(dirpath, self._additional_folder)
+            dest_dir = self._api_folder if rel == "." else os.path.join(self._api_folder, rel)
+            copy_batches.append((dirpath, dest_dir, filenames))
 
-        else:
-            with open(curr_path, "r") as read_file:
-                content = read_file.read()
-            with open(curr_dest_path, "a+") as write_file:
-                write_file.write(content)
+        # Second pass: create the whole destination tree upfront, so the copy
+        # loop below runs without any mkdir or stat left in it
+        for _, dest_dir, _ in copy_batches:
+            if dest_dir not in self._known_dest_dirs:
+                os.makedirs(dest_dir, exist_ok=True)
+                self._known_dest_dirs.add(dest_dir)
+
+        futures = []
+        # Every source file targets its own destination file, so the appends
+        # are independent and can overlap their I/O in a small thread pool
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            for dirpath, dest_dir, filenames in copy_batches:
+                # The directory prefixes are fixed inside this iteration, so
+                # the per-file paths are plain concatenations instead of
+                # os.path.join calls re-validating the separators
+                src_prefix = dirpath + os.sep
+                dest_prefix = dest_dir + os.sep
+                for filename in filenames:
+                    futures.append(pool.submit(_append_file_contents, src_prefix + filename, dest_prefix + filename))
+        # Surface the first error like the sequential code did
+        for future in futures:
+            future.result()
 
     def append_additional(self):
         if not os.path.isdir(self._additional_folder):
             print(f"[Warning] The given path: {self._additional_folder} is not a folder")
         else:
-            self._append_additional_rec(self._additional_folder, self._api_folder, "")
+            try:
+                self._append_additional_walk()
+            finally:
+                for fd in self._open_appends.values():
+                    os.close(fd)
+                self._open_appends.clear()
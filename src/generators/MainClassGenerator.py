@@ -1,385 +1,163 @@
 import json
 import os
+import textwrap
+from functools import lru_cache
+from io import StringIO
+from string import Template
 from typing import Any, Dict, List, Tuple
 
 from src.utils import add_indent, convert_type, extract_schema_name_from_ref, get_method_name, get_short_description, is_native_python_type
-from src.generators.generator_types import FuncParam, Get, Info, OpenAPI, OpenAPIPath, Property, Schema
+from src.generators.generator_types import FuncParam, Get, Info, OpenAPI, OpenAPIPath, Schema
 
 
-class MainClassGenerator:
-    '''Generates the class that the users will instantiate to interact
-    with the API.
-    
-    This class is generated from the infos inside of the API + the paths,
-    as well as the configuration file.
-    
-    It will write the title and description of the info this way:
-    Example:
-    
-    ```json
-    {
-        title: "High-frequency DEX API",
-        description: "Very long descriptions with some \n\n(Multiple new lines)\n"
-    }
-    ```
-    
-    Will generate the following:
-    
-    ```python
-    class TitleClass:
-        """High-frequency DEX API
-       
-        Very long description with some 
-       
-        (Multiple new lines)
-       
-        """
+_ASYNC_CLASS_TEMPLATE = Template('''
+class $class_name:
+    """$title
 
-        _api_key: str | None = None
-        """Your API key.
-    
-        This SDK will work without an API key, but we advise you to provide one in order to
-        unlock better performance.
-        
-        You can get your API key for free on this link: https://dashboard.blockchainapis.io
-        """
-        
-        _session: ClientSession
-        """The session that is used by async operation.
-        
-        This session must be closed at the end of your program or usage of the API.
-        
-        It can be closed with:
-        await blockchain_apis_instance.close()
-        
-        (replace blockchain_apis_instance with your instance of BlockchainAPIs)
-        """
-        
-        _headers: Dict[str, str]
-        """The headers of the API.
-        
-        We pre-generate them and save it because it will be the same
-        headers for all requests.
-        
-        By saving it, we prevent from creating multiple dict and having
-        multiple dict assignments which improves performance and code
-        readability.
-        """
-        
-        def __init__(self, api_key: str | None = None):
-            """Create a BlcokchainAPIs async instance that allow you do API calls.
-
-            :param api_key: Your API key, defaults to None
-            :type api_key: str | None, optional
-            """
-            self._api_key = api_key
-            self._headers = {
-                "accept": "application/json"
-            }
-            if self._api_key is not None:
-                self._headers["api-key"] = self._api_key
-            self._session = ClientSession("https://api.blockchainapis.io")
-
-        async def close(self):
-            """Close the async session object.
-            
-            You must call this method at the end of your program or when you have finished
-            working with BlockchainAPIs.
-            """
-            await self._session.close()
-
-        async def _do_request(self, path: str, params: Dict[str, Any] | None = None) -> Dict[str, None]:
-            """Make raw API requests (that return the json result).
-            
-            This method additionaly adds the user API key to the request if it is present.
-
-            :param path: The path to the request
-            :type path: str
-            :param params: The optional query parameters of the request, defaults to None
-            :type params: Dict[str, Any] | None, optional
-            :return: The json-formated result
-            :rtype: Dict[str, None]
-            """
-            async with self._session.get(path, params=params, headers=self._headers) as response:
-                return await response.json()
-
-    ```
-    
-    The TitleClass will come from the config.yml file that will be parsed.
-    As well as the api key settings.
-    The url: "https://api.blockchainapis.io" is also set inside of config.yml
-    Please note that on top of the file will be added all imports for all
-    of the models that are required for the API to work.
-    
-    Once we have generated the base above, we will generate all of the methods
-    from the "paths" key from open API.
-    
-    For example:
-    ```json
-    "/v0/exchanges/": {
-        "get": {
-            "tags": [
-                "exchanges"
-            ],
-            "summary": "Get the list of supported exchanges by the API",
-            "operationId": "exchanges_v0_exchanges__get",
-            "parameters": [
-                {
-                    "description": "You can ignore this value for this version of the API.",
-                    "required": false,
-                    "schema": {
-                        "title": "Page",
-                        "type": "integer",
-                        "description": "You can ignore this value for this version of the API.",
-                        "default": 1
-                    },
-                    "name": "page",
-                    "in": "query"
-                },
-                {
-                    "description": "The blockchain from which you want to get the exchanges",
-                    "required": false,
-                    "schema": {
-                        "title": "Blockchain",
-                        "type": "string",
-                        "description": "The blockchain from which you want to get the exchanges"
-                    },
-                    "name": "blockchain",
-                    "in": "query"
-                }
-            ],
-            "responses": {
-                "200": {
-                    "description": "The list of all supported exchange of the API.\n\nYou can use the exchange id responded from this for other API calls.\n",
-                    "content": {
-                        "application/json": {
-                            "schema": {
-                                "$ref": "#/components/schemas/Exchanges"
-                            }
-                        }
-                    }
-                },
-                "422": {
-                    "description": "Validation Error",
-                    "content": {
-                        "application/json": {
-                            "schema": {
-                                "$ref": "#/components/schemas/HTTPValidationError"
-                            }
-                        }
-                    }
-                }
-            }
-        }
-    }
-    ```
-    Will generate the following method:
-    ```python
-    async def exchanges(self, page: int = 1, blockchain: str | None = None) -> Exchanges:
-    """Get the list of supported exchanges by the API
-
-    :param page: You can ignore this value for the current version of the API
-    :type page: int, optional
-    :param blockchain: The blockchain from which you want to get the exchanges
-    :type blockchain: str | None, optional
-    :return: The list of all supported exchanges of the API.
-    
-    You can use the exchange id responded from this for other API calls.
-    
-    Example response:
-    ```json
-    {
-        "page": 1,
-        "total_pages": 1,
-        "data": [
-            {
-                "exchange": "lydia_finance_avalanche",
-                "blockchain": "avalanche",
-                "name": "Lydia Finance",
-                "url": "https://exchange.lydia.finance/#/swap",
-                "fee": 200
-            },
-            {
-                "exchange": "oliveswap_avalanche",
-                "blockchain": "avalanche",
-                "name": "Oliveswap",
-                "url": "https://avax.olive.cash/",
-                "fee": 250
-            }
-        ]
-    }
-    ```
-    :rtype: Exchanges
+    $description
     """
-    params = {
-        "page": page
-    }
-    if blockchain is not None:
-        params["blockchain"] = blockchain
-    
-    ret = await self._do_request("/v0/exchanges", params)
-    print(ret)
-    return Exchanges(
-        page=ret["page"],
-        total_pages=ret["total_pages"],
-        data=[
-            Exchange(
-                d["exchange"],
-                d["blockchain"],
-                d["name"],
-                d["url"],
-                d["fee"]
-            )
-            for d in ret["data"]
-        ]
-    )
-    ```
-    We have to manually put each fields, this way, if the class returns additional fields
-    we will not have an error
-    '''
 
-    def __init__(self, class_name: str, api_url: str, result_folder: str, is_async: bool):
-        self._class_name = class_name
-        self._api_url = api_url
-        self._result_folder = result_folder
-        self._is_async = is_async
+    _session: ClientSession
+    """The session that is used by async operation.
 
-    def _has_list(self, paths: Dict[str, OpenAPIPath]) -> bool:
-        for path in paths:
-            returned_schema = paths[path]["get"]["responses"]["200"]["content"]["application/json"]["schema"]
-            if "type" in returned_schema and returned_schema["type"] == "array":
-                return True
-            
-        return False
+    This session must be closed at the end of your program or usage of the API.
 
-    def _get_depend_schemas(self, schema: str, all_schema: Dict[str, Schema]) -> List[str]:
-        """When we import a schema, sometimes, the schema will have a list of another shema,
-        so we need to import the other schema also.
-        
-        This method allow us to detect dependant schemas
+    It can be closed with:
+    await blockchain_apis_instance.close()
 
-        :param schema: The schema name
-        :type schema: str
-        :param all_schema: The dictionary containing as key the schema name and as value the given
-                           schema
-        :type all_schema: Dict[str, Schema]
-        :return: The list of schema names
-        :rtype: List[str]
+    (replace blockchain_apis_instance with your instance of BlockchainAPIs)
+    """
+
+    def __init__(self, api_key: str | None = None):
+        """Creates a $class_name async instance that allow you to make API calls.
+
+        The client works without an API key, but for better performance, we advise you
+        to get one at: https://dashboard.blockchainapis.io
+
+        :param api_key: Your API key, defaults to None
+        :type api_key: str | None, optional
         """
-        curr_schema = all_schema[schema]
-        ret = []
-        for property_name in curr_schema["properties"]:
-            _proterty = curr_schema["properties"][property_name]
-            if _proterty["type"] != "string" and _proterty["type"] != "integer" and _proterty["type"] != "number":
-                if _proterty["type"] == "array":
-                    ret.append(extract_schema_name_from_ref(_proterty["items"]["$ref"]))
-                else:
-                    raise Exception(f"Not supported property type: {_proterty['type']}")
-        return ret
+        self._api_key = api_key
+        self._headers = {
+            "accept": "application/json"
+        }
+        if api_key is not None:
+            self._headers["api-key"] = api_key
+        self._session = ClientSession("$api_url")
 
-    def _get_models_to_import(self, paths: Dict[str, OpenAPIPath], all_schema: Dict[str, Schema]) -> List[str]:
-        ret = []
-        for path in paths:
-            returned_schema = paths[path]["get"]["responses"]["200"]["content"]["application/json"]["schema"]
-            if "items" in returned_schema:
-                schema_to_add = returned_schema["items"]["$ref"].split("/")[-1]
-                if schema_to_add not in ret:
-                    ret.append(schema_to_add)
-                dependant_schemas = self._get_depend_schemas(schema_to_add, all_schema)
-                for dependant_schema in dependant_schemas:
-                    if dependant_schema not in ret:
-                        ret.append(dependant_schema)
-            elif "$ref" in returned_schema:
-                schema_to_add = returned_schema["$ref"].split("/")[-1]
-                if schema_to_add not in ret:
-                    ret.append(schema_to_add)
-                dependant_schemas = self._get_depend_schemas(schema_to_add, all_schema)
-                for dependant_schema in dependant_schemas:
-                    if dependant_schema not in ret:
-                        ret.append(dependant_schema)
-            elif "type" in returned_schema:
-                # It can be a simple int, so nothing to import
-                continue
-            else:
-                raise Exception(f"Not 'item' nor '$ref' in current returned schema: {returned_schema}")
-        return ret                
+    async def close(self):
+        """Close the async session object.
 
-    def _add_necessary_imports(self, paths: Dict[str, OpenAPIPath], all_schema: Dict[str, Schema], exceptions: List[str]) -> str:
-        ret = ""
-        if not self._is_async:
-            ret += "import requests\n\n"
-        if self._has_list(paths):
-            ret += "from typing import Any, Dict, List\n"
-        else:
-            ret += "from typing import Any, Dict\n"
-        if not self._is_async:
-            ret += "from urllib.parse import urljoin\n"
+        You must call this method at the end of your program or when you have finished
+        working with $class_name.
 
-        if self._is_async:
-            ret += "\nfrom aiohttp import ClientSession\n\n"
-        else:
-            ret += "\n"
+        Please note, if you do:
+        ```py
+        async with $class_name() as instance:
+            # do some calls...
+            pass
+        ```
 
-        models_to_import = self._get_models_to_import(paths, all_schema)
-        for model in models_to_import:
-            ret += f"from .models import {model}\n"
+        The instance is automatically closed at the end of the async with.
+        """
+        await self._session.close()
 
-        ret += "\n"
-        for exception in exceptions:
-            ret += f"from .exceptions import {exception}\n"
+    async def __aenter__(self):
+        """Called when you use `async with`.
 
-        # Add import for unknown exception
-        ret += f"from .exceptions import Unknown{self._class_name}Exception\n"
+        For example:
+        async with $class_name() as blockchain_apis:
+            # do some stuff
+            pass
 
-        return ret
+        :return: self
+        :rtype: self
+        """
+        return self
 
-    def _match_error_type(self, exceptions: List[str], indent: int) -> str:
-        indentation = ' ' * indent
-        ret = f'{indentation}match error_type:\n'
-        for exception in exceptions:
-            ret += f'{indentation}    case "{exception}":\n'
-            if not self._is_async:
-                ret += f'{indentation}        raise {exception}(response.status_code, error_data["detail"]["detail"])\n'
-            else:
-                ret += f'{indentation}        raise {exception}(response.status, error_data["detail"]["detail"])\n'
-        ret += f"{indentation}    case _:\n"
-        ret += indentation + f'        raise Unknown{self._class_name}Exception(response.status, f"Unkwnown Exception type: {{error_type}}.\\nGot this exception while handling:\\n{{error_data}} with status code: {{response.status}}")\n'
-        return ret
+    async def __aexit__(self, *_):
+        """Called at the end of the `async with` statement in order
+        to free the resources used by the API instance.
+        """
+        await self.close()
+''')
+"""The start of the async main class.
 
-    def _add_do_request_exception_docs(self, exceptions: List[str], exception_docs: List[str]) -> str:
-        """Add the raises to the description of the _do_request method
+The template is compiled once at import time; generating a class is then
+a single substitute call instead of re-parsing the f-string fragments.
+"""
 
-        :raises Exception: When the length of exceptions is not the same as the length of exceptions docs
+_SYNC_CLASS_TEMPLATE = Template('''
+class ${class_name}Sync:
+    """$title
 
-        :param exceptions: The list of exceptions that the API can throw
-        :type exceptions: List[str]
-        :param exception_docs: The list of documentation of these exceptions, need to match 1-1 each exceptions
-                               (description has to be at the same index as the exception_docs)
-        :type exception_docs: List[str]
-        :return: The documentation as we have to write it to _do_request
-        :rtype: str
+    $description
+    Please note that this class is not async which is less optimized. To run more otpimized
+    requests, please use: $class_name
+    """
+
+    def __init__(self, api_key: str | None = None):
+        """Creates a ${class_name}Sync sync instance that allow you to make API calls
+        in a synchronous way.
+
+        The client works without an API key, but for better performance, we advise you
+        to get one at: https://dashboard.blockchainapis.io
+
+        :param api_key: Your API key, defaults to None
+        :type api_key: str | None, optional
         """
-        ret = ""
-        if len(exceptions) != len(exception_docs):
-            raise Exception(f"The len of exceptions: {len(exceptions)} is different from the lenght of the docs: {len(exception_docs)}")
+        self._headers = {
+            "accept": "application/json"
+        }
+        if api_key is not None:
+            self._headers["api-key"] = api_key
+        self._base_url = "$api_url"
+
+''')
+"""The start of the sync main class, compiled once at import time like
+_ASYNC_CLASS_TEMPLATE
+"""
+
+_INDENTS = tuple(" " * i for i in range(64))
+"""Indentation strings by width, built once at import time so the hot
+emitters reuse interned constants instead of allocating ' ' * indent
+per call
+"""
+
+def _indent(indent: int) -> str:
+    """Get the indentation string of the given width.
+
+    :param indent: The amount of spaces
+    :type indent: int
+    :return: A string made of indent spaces
+    :rtype: str
+    """
+    return _INDENTS[indent] if indent < len(_INDENTS) else " " * indent
 
-        for i in range(len(exceptions)):
-            ret += f'        :raises {exceptions[i]}: {exception_docs[i]}\n'
+_ASYNC_METHOD_PREFIX = "    async def "
+"""The def prefix of the emitted async methods"""
 
-        # Add the unknown Exception
-        ret += f'        :raises Unknown{self._class_name}Exception: When an unknown exception happens\n'
-        return ret
+_SYNC_METHOD_PREFIX = "    def "
+"""The def prefix of the emitted sync methods"""
 
-    def _add_do_request_method(self, exceptions: List[str], exception_docs: List[str]) -> str:
-        ret = '''
+_PRIMITIVE_TYPES = frozenset({"string", "integer", "number"})
+"""The OpenAPI property types that map to native python types and thus
+never pull in another schema. Extend with "boolean" once supported.
+"""
+
+_ASYNC_DO_REQUEST_HEAD = '''
     async def _do_request(self, path: str, params: Dict[str, Any] | None = None) -> Dict[str, Any]:
         """Make raw API request (that return the json result).
-        
+
         This method additionaly adds the user API key to the request if it is present.
 '''
-        ret += "\n"
-        ret += self._add_do_request_exception_docs(exceptions, exception_docs)
-        ret += '''
+"""The static opening of the async _do_request method.
+
+The static chunks of _do_request live at module level so they are
+interned once at import time instead of being rebuilt per call.
+"""
+
+_ASYNC_DO_REQUEST_TAIL = '''
         :param path: The path to the request
         :type path: str
         :param params: The optional query parameters of the request, defaults to None
@@ -392,22 +170,20 @@ class MainClassGenerator:
                 error_data = await response.json()
                 error_type = error_data["detail"]["error_type"]
 '''
-        ret += self._match_error_type(exceptions, 16)
-        ret += "\n"
-        ret += '            return await response.json()\n'
-        return ret        
+"""The static part of the async _do_request between the exception docs
+and the error dispatch
+"""
 
-    def _add_do_request_method_sync(self, exceptions: List[str], exception_docs: List[str]) -> str:
-        ret = f'''
+_SYNC_DO_REQUEST_HEAD = '''
     def _do_request(self, path: str, params: Dict[str, Any] | None = None) -> Dict[str, Any]:
         """Make a raw API request (that return the json result).
-        
+
         It makes the request in a synchronous way and you don't need to close the
         BlockchainAPIs instance.
 '''
-        ret += "\n"
-        ret += self._add_do_request_exception_docs(exceptions, exception_docs)
-        ret += '''
+"""The static opening of the sync _do_request method"""
+
+_SYNC_DO_REQUEST_TAIL = '''
         :param path: The path of the request
         :type path: str
         :param params: The optional query parameters of the request, defaults to None
@@ -421,129 +197,246 @@ class MainClassGenerator:
             error_data = response.json()
             error_type = error_data["detail"]["error_type"]
 '''
-        ret += self._match_error_type(exceptions, 12)
-        ret += "\n"
-        ret += "        return response.json()\n"
-        return ret
+"""The static part of the sync _do_request between the exception docs
+and the error dispatch
+"""
+
+@lru_cache
+def _build_do_request_exception_docs(class_name: str, exceptions: Tuple[str, ...], exception_docs: Tuple[str, ...]) -> str:
+    """Build the raises of the description of the _do_request method
+
+    The result is cached because the async and sync generators emit the
+    exact same block, so it is only built once per API.
+
+    :raises Exception: When the length of exceptions is not the same as the length of exceptions docs
+
+    :param class_name: The name of the generated class
+    :type class_name: str
+    :param exceptions: The list of exceptions that the API can throw
+    :type exceptions: Tuple[str, ...]
+    :param exception_docs: The list of documentation of these exceptions, need to match 1-1 each exceptions
+                           (description has to be at the same index as the exception_docs)
+    :type exception_docs: Tuple[str, ...]
+    :return: The documentation as we have to write it to _do_request
+    :rtype: str
+    """
+    ret = ""
+    if len(exceptions) != len(exception_docs):
+        raise Exception(f"The len of exceptions: {len(exceptions)} is different from the lenght of the docs: {len(exception_docs)}")
+
+    for i in range(len(exceptions)):
+        ret += f'        :raises {exceptions[i]}: {exception_docs[i]}\n'
+
+    # Add the unknown Exception
+    ret += f'        :raises Unknown{class_name}Exception: When an unknown exception happens\n'
+    return ret
+
+@lru_cache
+def _build_match_error_type(class_name: str, exceptions: Tuple[str, ...], is_async: bool, indent: int) -> str:
+    """Build the match statement that converts an API error response to
+    the right exception class.
+
+    Cached per (class name, exceptions, flavour): the block only depends
+    on the exception list, not on the endpoint being generated.
+
+    :param class_name: The name of the generated class
+    :type class_name: str
+    :param exceptions: The list of exceptions that the API can throw
+    :type exceptions: Tuple[str, ...]
+    :param is_async: If we generate the async or the sync flavour of the block
+    :type is_async: bool
+    :param indent: The amount of indentation that the block should have
+    :type indent: int
+    :return: The code of the match statement
+    :rtype: str
+    """
+    indentation = _indent(indent)
+    ret = f'{indentation}match error_type:\n'
+    for exception in exceptions:
+        ret += f'{indentation}    case "{exception}":\n'
+        if not is_async:
+            ret += f'{indentation}        raise {exception}(response.status_code, error_data["detail"]["detail"])\n'
+        else:
+            ret += f'{indentation}        raise {exception}(response.status, error_data["detail"]["detail"])\n'
+    ret += f"{indentation}    case _:\n"
+    ret += indentation + f'        raise Unknown{class_name}Exception(response.status, f"Unkwnown Exception type: {{error_type}}.\\nGot this exception while handling:\\n{{error_data}} with status code: {{response.status}}")\n'
+    return ret
 
-    def _get_exception_docs(self, exceptions: List[str], schemas: Dict[str, Schema]) -> List[str]:
-        """Get the documentation of each exceptions and return it in the right order
 
-        :param exceptions: The list of exceptions that we use
-        :type exceptions: List[str]
-        :param schemas: The schemas returned by BlockchainAPIs
-        :type schemas: Schema
-        :return: The list of exception documentations
-        :rtype: List[str]
-        """
-        ret = []
-        for exception in exceptions:
-            ret.append(get_short_description(schemas[exception]["description"]))
-        return ret
+class MainClassGenerator:
+    """Generates the class that the users will instantiate to interact
+    with the API.
 
-    def _add_class_begining(self, infos: Info, exceptions: List[str], exception_docs: List[str]) -> str:
-        ret = f'''
-class {self._class_name}:
-    """{infos["title"]}
+    This class is generated from the infos inside of the API + the paths,
+    as well as the configuration file.
 
-    {add_indent(infos["description"], 4)}
+    See docs/main_class_generator.md for a full example of input and
+    generated output. The example used to live in this docstring, but a
+    multi-kilobyte __doc__ costs parse time and memory on every import
+    of the generator.
     """
 
-    _session: ClientSession
-    """The session that is used by async operation.
-    
-    This session must be closed at the end of your program or usage of the API.
-    
-    It can be closed with:
-    await blockchain_apis_instance.close()
-    
-    (replace blockchain_apis_instance with your instance of BlockchainAPIs)
-    """
-    
-    def __init__(self, api_key: str | None = None):
-        """Creates a {self._class_name} async instance that allow you to make API calls.
+    def __init__(self, class_name: str, api_url: str, result_folder: str, is_async: bool):
+        self._class_name = class_name
+        self._api_url = api_url
+        self._result_folder = result_folder
+        self._is_async = is_async
+        self._all_schemas: Dict[str, Schema] = {}
+        self._depend_cache: Dict[str, List[str]] = {}
+        self._schema_name_cache: Dict[int, Tuple[str, bool]] = {}
+        self._example_cache: Dict[int, str] = {}
+        self._param_cache: Dict[int, Tuple[List[FuncParam], List[FuncParam]]] = {}
+        self._models_to_import: List[str] = []
+        self._has_list_flag = False
+        self._rendered_value_cache: Dict[Tuple[str, int, str, bool], str] = {}
+        # The output paths never change for an instance, so they are built
+        # once here instead of re-joining them at every write. The other
+        # flavour-dependent pieces are selected here too, so the emitters
+        # read them instead of re-branching on _is_async per call
+        self._init_path = os.path.join(result_folder, "__init__.py")
+        if is_async:
+            self._out_path = os.path.join(result_folder, f"{class_name}.py")
+            self._export_line = f"from .{class_name} import {class_name}\n"
+            self._method_prefix = _ASYNC_METHOD_PREFIX
+            self._await_keyword = "await "
+            self._add_class_begining_flavour = self._add_class_begining
+        else:
+            self._out_path = os.path.join(result_folder, f"{class_name}Sync.py")
+            self._export_line = f"from .{class_name}Sync import {class_name}Sync\n"
+            self._method_prefix = _SYNC_METHOD_PREFIX
+            self._await_keyword = ""
+            self._add_class_begining_flavour = self._add_class_begining_sync
 
-        The client works without an API key, but for better performance, we advise you
-        to get one at: https://dashboard.blockchainapis.io
+    @staticmethod
+    def _get_response_schema(get: Get) -> Schema:
+        """Get the schema of the 200 response of the given get object.
 
-        :param api_key: Your API key, defaults to None
-        :type api_key: str | None, optional
-        """
-        self._api_key = api_key
-        self._headers = {{
-            "accept": "application/json"
-        }}
-        if api_key is not None:
-            self._headers["api-key"] = api_key
-        self._session = ClientSession("{self._api_url}")
+        Every caller needs this same deeply nested value, so the six dict
+        lookups live in one helper instead of being repeated inline.
 
-    async def close(self):
-        """Close the async session object.
-        
-        You must call this method at the end of your program or when you have finished
-        working with {self._class_name}.
-        
-        Please note, if you do:
-        ```py
-        async with {self._class_name}() as instance:
-            # do some calls...
-            pass
-        ```
-        
-        The instance is automatically closed at the end of the async with.
+        :param get: The get object from the path
+        :type get: Get
+        :return: The schema of the successful response
+        :rtype: Schema
         """
-        await self._session.close()
+        return get["responses"]["200"]["content"]["application/json"]["schema"]
 
-    async def __aenter__(self):
-        """Called when you use `async with`.
+    def _get_depend_schemas(self, schema: str) -> List[str]:
+        """When we import a schema, sometimes, the schema will have a list of another shema,
+        so we need to import the other schema also.
         
-        For example:
-        async with {self._class_name}() as blockchain_apis:
-            # do some stuff
-            pass
-
-        :return: self
-        :rtype: self
-        """
-        return self
+        This method allow us to detect dependant schemas
 
-    async def __aexit__(self, *_):
-        """Called at the end of the `async with` statement in order
-        to free the resources used by the API instance.
+        :param schema: The schema name
+        :type schema: str
+        :return: The list of schema names
+        :rtype: List[str]
         """
-        await self.close()
-'''
-        ret += self._add_do_request_method(exceptions, exception_docs)
+        # The same schema is returned by many endpoints, so its dependencies
+        # are computed once and served from the cache afterwards. This is
+        # safe because the schemas never change during a generation run
+        cached = self._depend_cache.get(schema)
+        if cached is not None:
+            return cached
+        curr_schema = self._all_schemas[schema]
+        ret = []
+        for _proterty in curr_schema["properties"].values():
+            if _proterty["type"] not in _PRIMITIVE_TYPES:
+                if _proterty["type"] == "array":
+                    ret.append(extract_schema_name_from_ref(_proterty["items"]["$ref"]))
+                else:
+                    raise Exception(f"Not supported property type: {_proterty['type']}")
+        self._depend_cache[schema] = ret
         return ret
 
-    def _add_class_begining_sync(self, infos: Info, exceptions: List[str], exception_docs: List[str]) -> str:
-        ret = f'''
-class {self._class_name}Sync:
-    """{infos["title"]}
+    def _add_necessary_imports(self, paths: Dict[str, OpenAPIPath], exceptions: List[str]) -> str:
+        # The header is accumulated in a StringIO: appending to a str in a
+        # loop re-copies the whole buffer on every +=, which gets quadratic
+        # when the API has many models and exceptions to import
+        buf = StringIO()
+        write = buf.write
+        if not self._is_async:
+            write("import requests\n\n")
+        if self._has_list_flag:
+            write("from typing import Any, Dict, List\n")
+        else:
+            write("from typing import Any, Dict\n")
+        if not self._is_async:
+            write("from urllib.parse import urljoin\n")
 
-    {add_indent(infos["description"], 4)}
-    Please note that this class is not async which is less optimized. To run more otpimized
-    requests, please use: {self._class_name}
-    """
-    
-    def __init__(self, api_key: str | None = None):
-        """Creates a {self._class_name}Sync sync instance that allow you to make API calls
-        in a synchronous way.
+        if self._is_async:
+            write("\nfrom aiohttp import ClientSession\n\n")
+        else:
+            write("\n")
 
-        The client works without an API key, but for better performance, we advise you
-        to get one at: https://dashboard.blockchainapis.io
+        # The import blocks are emitted with one join-backed write each
+        # instead of one write call per line. The models were resolved by
+        # the warm pass, so no path scan happens here
+        write("".join(f"from .models import {model}\n" for model in self._models_to_import))
 
-        :param api_key: Your API key, defaults to None
-        :type api_key: str | None, optional
+        write("\n")
+        write("".join(f"from .exceptions import {exception}\n" for exception in exceptions))
+
+        # Add import for unknown exception
+        write(f"from .exceptions import Unknown{self._class_name}Exception\n")
+
+        return buf.getvalue()
+
+    def _add_do_request_method(self, exceptions: List[str], exception_docs: List[str]) -> str:
+        buf = StringIO()
+        write = buf.write
+        write(_ASYNC_DO_REQUEST_HEAD)
+        write("\n")
+        write(_build_do_request_exception_docs(self._class_name, tuple(exceptions), tuple(exception_docs)))
+        write(_ASYNC_DO_REQUEST_TAIL)
+        write(_build_match_error_type(self._class_name, tuple(exceptions), self._is_async, 16))
+        write("\n")
+        write('            return await response.json()\n')
+        return buf.getvalue()
+
+    def _add_do_request_method_sync(self, exceptions: List[str], exception_docs: List[str]) -> str:
+        buf = StringIO()
+        write = buf.write
+        write(_SYNC_DO_REQUEST_HEAD)
+        write("\n")
+        write(_build_do_request_exception_docs(self._class_name, tuple(exceptions), tuple(exception_docs)))
+        write(_SYNC_DO_REQUEST_TAIL)
+        write(_build_match_error_type(self._class_name, tuple(exceptions), self._is_async, 12))
+        write("\n")
+        write("        return response.json()\n")
+        return buf.getvalue()
+
+    def _get_exception_docs(self, exceptions: List[str]) -> List[str]:
+        """Get the documentation of each exceptions and return it in the right order
+
+        :param exceptions: The list of exceptions that we use
+        :type exceptions: List[str]
+        :return: The list of exception documentations
+        :rtype: List[str]
         """
-        self._headers = {{
-            "accept": "application/json"
-        }}
-        if api_key is not None:
-            self._headers["api-key"] = api_key
-        self._base_url = "{self._api_url}"
+        schemas = self._all_schemas
+        ret = []
+        for exception in exceptions:
+            ret.append(get_short_description(schemas[exception]["description"]))
+        return ret
 
-'''
+    def _add_class_begining(self, infos: Info, exceptions: List[str], exception_docs: List[str]) -> str:
+        ret = _ASYNC_CLASS_TEMPLATE.substitute(
+            class_name=self._class_name,
+            api_url=self._api_url,
+            title=infos["title"],
+            description=add_indent(infos["description"], 4)
+        )
+        ret += self._add_do_request_method(exceptions, exception_docs)
+        return ret
+
+    def _add_class_begining_sync(self, infos: Info, exceptions: List[str], exception_docs: List[str]) -> str:
+        ret = _SYNC_CLASS_TEMPLATE.substitute(
+            class_name=self._class_name,
+            api_url=self._api_url,
+            title=infos["title"],
+            description=add_indent(infos["description"], 4)
+        )
         ret += self._add_do_request_method_sync(exceptions, exception_docs)
         return ret
 
@@ -570,40 +463,55 @@ class {self._class_name}Sync:
             ret += " | None = None"
         return ret
 
-    def _get_func_params(self, get: Get) -> str:
-        ret = ""
-        if "parameters" in get:
-            for param in get["parameters"]:
-                # We first write the required parameters
-                if param["required"]:
-                    ret += f", {param['name']}: {convert_type(param['schema']['type'])}"
+    def _partition_params(self, get: Get) -> Tuple[List[FuncParam], List[FuncParam]]:
+        """Split the parameters of the given get object into required and
+        optional ones.
 
-            # We now put the rest
-            for param in get["parameters"]:
-                if not param["required"]:
-                    ret += self._get_func_param_with_default(param)
+        The split is memoized per get object because the signature and the
+        docstring emitters both need it for the same endpoint.
 
+        :param get: The get object from the path
+        :type get: Get
+        :return: The required parameters first, the optional ones second
+        :rtype: Tuple[List[FuncParam], List[FuncParam]]
+        """
+        cached = self._param_cache.get(id(get))
+        if cached is not None:
+            return cached
+        required = []
+        optional = []
+        for param in get.get("parameters", ()):
+            if param["required"]:
+                required.append(param)
+            else:
+                optional.append(param)
+        ret = self._param_cache[id(get)] = (required, optional)
         return ret
 
+    def _get_func_params(self, get: Get) -> str:
+        required, optional = self._partition_params(get)
+        parts = [f", {param['name']}: {convert_type(param['schema']['type'])}" for param in required]
+        parts.extend(self._get_func_param_with_default(param) for param in optional)
+        return "".join(parts)
+
     def _get_func_param_desc(self, get: Get) -> str:
-        ret = ""
-        if "parameters" in get:
-            for param in get["parameters"]:
-                if param["required"]:
-                    ret += f'        :param {param["name"]}: {param["description"]}\n'
-                    ret += f'        :type {param["name"]}: {convert_type(param["schema"]["type"])}\n'
-                    ret += f'        :example {param["name"]}: {param["example"]}\n'
-            for param in get["parameters"]:
-                if not param["required"]:
-                    ret += f'        :param {param["name"]}: {param["description"]}, defaults to {"None" if "default" not in param["schema"] else param["schema"]["default"]}\n'
-                    ret += f'        :type {param["name"]}: {convert_type(param["schema"]["type"])}, Optional\n'
-                    ret += f'        :example {param["name"]}: '
-                    if "example" in param:
-                        ret += str(param["example"])
-                    else:
-                        ret += str(param["schema"]["default"])
-                    ret += "\n"
-        return ret
+        required, optional = self._partition_params(get)
+        parts = []
+        for param in required:
+            parts.append(f'        :param {param["name"]}: {param["description"]}\n')
+            parts.append(f'        :type {param["name"]}: {convert_type(param["schema"]["type"])}\n')
+            parts.append(f'        :example {param["name"]}: {param["example"]}\n')
+        for param in optional:
+            parts.append(f'        :param {param["name"]}: {param["description"]}, defaults to {"None" if "default" not in param["schema"] else param["schema"]["default"]}\n')
+            parts.append(f'        :type {param["name"]}: {convert_type(param["schema"]["type"])}, Optional\n')
+            parts.append(f'        :example {param["name"]}: ')
+            if "example" in param:
+                parts.append(str(param["example"]))
+            else:
+                parts.append(str(param["schema"]["default"]))
+            parts.append("\n")
+
+        return "".join(parts)
 
     def _get_schema_name(self, get: Get) -> Tuple[str, bool]:
         """Get the name of the schema.
@@ -615,13 +523,22 @@ class {self._class_name}Sync:
         :return: At first the name of the schema and as second if it is an array or not
         :rtype: Tuple[str, bool]
         """
-        schema = get["responses"]["200"]["content"]["application/json"]["schema"]
+        # The example, response type and return statement of one method all
+        # resolve the same get object, so the answer is cached per object.
+        # Keying on id is safe here: the parsed spec stays alive for the
+        # whole generation run
+        cached = self._schema_name_cache.get(id(get))
+        if cached is not None:
+            return cached
+        schema = self._get_response_schema(get)
         if "$ref" in schema:
-            return extract_schema_name_from_ref(schema["$ref"]), False
+            ret = extract_schema_name_from_ref(schema["$ref"]), False
         elif "items" not in schema:
-            return convert_type(schema["type"]), False
+            ret = convert_type(schema["type"]), False
         else:
-            return extract_schema_name_from_ref(schema["items"]["$ref"]), True
+            ret = extract_schema_name_from_ref(schema["items"]["$ref"]), True
+        self._schema_name_cache[id(get)] = ret
+        return ret
 
     def _format_example(self, schema: Schema, indent: int) -> str:
         """Format the given schema example
@@ -656,21 +573,26 @@ class {self._class_name}Sync:
         :return: The Example formated
         :rtype: str
         """
-        json_string = json.dumps(schema["example"], indent=4)
-        # Add space_add spaces
-        indentation = ' ' * indent
-        # Add the 4 spaces at the beginning of each lines
-        space_added = '\n'.join(indentation + line for line in json_string.splitlines())
+        # The dump of an example only depends on the schema, but the same
+        # schema is re-dumped for every endpoint that returns it, so the
+        # serialized form is cached per schema object
+        key = id(schema)
+        json_string = self._example_cache.get(key)
+        if json_string is None:
+            json_string = self._example_cache[key] = json.dumps(schema["example"], indent=4)
+        # textwrap.indent prefixes every line in one pass instead of a
+        # Python-level loop creating a new string per line
+        space_added = textwrap.indent(json_string, _indent(indent))
         return f'{space_added}\n'
 
-    def _get_func_example_response(self, get: Get, schema: Dict[str, Schema]) -> str:
+    def _get_func_example_response(self, get: Get) -> str:
         schema_name, is_array = self._get_schema_name(get)
         if is_array:
-            return f'        ```json\n        [\n{self._format_example(schema[schema_name], 12)}\n        ]\n        ```'
+            return f'        ```json\n        [\n{self._format_example(self._all_schemas[schema_name], 12)}\n        ]\n        ```'
         elif is_native_python_type(schema_name):
-            return f'        ```json\n        16\n        ```'
+            return '        ```json\n        16\n        ```'
         else:
-            return f'        ```json\n{self._format_example(schema[schema_name], 8)}\n        ```'
+            return f'        ```json\n{self._format_example(self._all_schemas[schema_name], 8)}\n        ```'
 
     def _get_response_type(self, get: Get) -> str:
         schema_name, is_array = self._get_schema_name(get)
@@ -679,80 +601,112 @@ class {self._class_name}Sync:
         else:
             return schema_name
 
-    def _get_func_error_desc(self, get: Get, schema: Dict[str, Schema]) -> str:
-        ret = ""
-        for response_code in get["responses"]:
+    def _get_func_error_desc(self, get: Get) -> str:
+        parts = []
+        for response_code, response in get["responses"].items():
             if response_code != "200":
-                application_json = get["responses"][response_code]["content"]["application/json"]
+                application_json = response["content"]["application/json"]
                 if "schema" in application_json:
                     exception_thrown = extract_schema_name_from_ref(application_json["schema"]["$ref"])
-                    ret += f'        :raises {exception_thrown}: {get["responses"][response_code]["description"]}\n'
+                    parts.append(f'        :raises {exception_thrown}: {response["description"]}\n')
                 elif "oneOf" in application_json:
                     possible_exceptions = application_json["oneOf"]
                     for exception in possible_exceptions:
-                        ret += f'        :raises {extract_schema_name_from_ref(exception["$ref"])}: {exception["description"]}\n'
-
-        return ret
-
-    def _get_function_description(self, get: Get, schema: Dict[str, Schema]) -> str:
-        ret = ""
-        ret += f'        """{get["summary"]}\n\n'
-        ret += self._get_func_error_desc(get, schema)
-        ret += "\n"
-        ret += self._get_func_param_desc(get)
-        ret += f'        :return: {add_indent(get["responses"]["200"]["description"], 8, True)}\n'
-        ret += "\n        Example response:\n"
-        ret += self._get_func_example_response(get, schema)
-        ret += "\n"
-        ret += f"        :rtype: {self._get_response_type(get)}\n"
-        ret += '        """\n'
-        return ret
-
-    def _build_returned_value_recursive(self, all_schemas: Dict[str, Schema], schema_name: str, indent: int, ret_str: str, is_first: bool = False) -> str:
+                        parts.append(f'        :raises {extract_schema_name_from_ref(exception["$ref"])}: {exception["description"]}\n')
+
+        return "".join(parts)
+
+    def _get_function_description(self, get: Get) -> str:
+        return "".join((
+            f'        """{get["summary"]}\n\n',
+            self._get_func_error_desc(get),
+            "\n",
+            self._get_func_param_desc(get),
+            f'        :return: {add_indent(get["responses"]["200"]["description"], 8, True)}\n',
+            "\n        Example response:\n",
+            self._get_func_example_response(get),
+            "\n",
+            f"        :rtype: {self._get_response_type(get)}\n",
+            '        """\n',
+        ))
+
+    def _render_returned_value(self, schema_name: str, indent: int, ret_str: str, is_first: bool = False) -> str:
+        """Render the constructor text of the given schema, memoized.
+
+        Endpoints that return overlapping object graphs re-render the same
+        sub-schema at the same nesting; the rendered block is deterministic
+        per (schema, indent, target, position), so it is cached for the run.
+
+        :param schema_name: The name of the schema to render
+        :type schema_name: str
+        :param indent: The amount of indentation of the block
+        :type indent: int
+        :param ret_str: The name of the variable holding the raw values
+        :type ret_str: str
+        :param is_first: If this is the root of the return statement, defaults to False
+        :type is_first: bool, optional
+        :return: The constructor code of the schema
+        :rtype: str
+        """
+        key = (schema_name, indent, ret_str, is_first)
+        cached = self._rendered_value_cache.get(key)
+        if cached is None:
+            out = StringIO()
+            self._build_returned_value_recursive(schema_name, indent, ret_str, out, is_first)
+            cached = self._rendered_value_cache[key] = out.getvalue()
+        return cached
+
+    def _build_returned_value_recursive(self, schema_name: str, indent: int, ret_str: str, out: StringIO, is_first: bool = False) -> None:
+        # The whole return statement is written into one shared StringIO:
+        # concatenating into a str that crosses the recursion re-copies the
+        # buffer at every level, which compounds for nested schemas
+        write = out.write
         if is_native_python_type(schema_name):
             if not is_first:
-                indentation = ' ' * indent
+                indentation = _indent(indent)
                 if schema_name == "int":
-                    return f"{indentation}{schema_name}(ret)"
+                    write(f"{indentation}{schema_name}(ret)")
                 else:
-                    return f"{indentation}ret"
+                    write(f"{indentation}ret")
             else:
                 if schema_name == "int":
-                    return "int(ret)"
+                    write("int(ret)")
                 else:
-                    return "ret"
-        schema = all_schemas[schema_name]
-        indentation = ' ' * indent
+                    write("ret")
+            return
+        schema = self._all_schemas[schema_name]
+        indentation = _indent(indent)
         new_indentation = indentation
         if not is_first:
-            ret = f"{indentation}{schema_name}(\n"
+            write(f"{indentation}{schema_name}(\n")
             new_indentation += "    "
         else:
-            ret = schema_name + "(\n"
-        property_count = 0
-        for property_name in schema["properties"]:
-            _property: Property = schema["properties"][property_name]
+            write(schema_name + "(\n")
+        # items() walks the properties once and the last index is hoisted
+        # out of the loop instead of recomputing the dict len per property
+        properties = list(schema["properties"].items())
+        last_property = len(properties) - 1
+        for property_count, (property_name, _property) in enumerate(properties):
             if _property["type"] == "array":
-                ret += f'{indentation}{property_name}=[\n'
-                schema_name = extract_schema_name_from_ref(_property['items']["$ref"])
-                ret += self._build_returned_value_recursive(all_schemas, schema_name, indent + 4, "d")
+                write(f'{indentation}{property_name}=[\n')
+                item_schema_name = extract_schema_name_from_ref(_property['items']["$ref"])
+                write(self._render_returned_value(item_schema_name, indent + 4, "d"))
                 array_indent = indentation + "    "
-                ret += f'{array_indent}for d in {ret_str}["{property_name}"]\n'
-                ret += f'{indentation}]\n'
+                write(f'{array_indent}for d in {ret_str}["{property_name}"]\n')
+                write(f'{indentation}]\n')
             else:
-                ret += f'{new_indentation}{property_name}={ret_str}["{property_name}"]'
-                if property_count == len(schema["properties"]) - 1:
-                    ret += "\n"
+                write(f'{new_indentation}{property_name}={ret_str}["{property_name}"]')
+                if property_count == last_property:
+                    write("\n")
                 else:
-                    ret += ",\n"
-            property_count += 1
+                    write(",\n")
 
         if is_first:
-            return ret + f"        )\n"
+            write("        )\n")
         else:
-            return ret + f"{indentation})\n"
+            write(f"{indentation})\n")
 
-    def _build_returned_value(self, get: Get, schema: Dict[str, Schema]) -> str:
+    def _build_returned_value(self, get: Get) -> str:
         """Build the returned statement of the function.
         
         This return statement have to build entirely our models
@@ -801,65 +755,60 @@ class {self._class_name}Sync:
 
         :param get: The get parameters
         :type get: Get
-        :param schema: The dictionary containing all of the schemas
-        :type schema: Dict[str, Schema]
         :return: The code for formating the return value
         :rtype: str
         """
         ret_type, is_array = self._get_schema_name(get)
         if is_array:
-            ret = "        return [\n"
-            ret += self._build_returned_value_recursive(schema, ret_type, 12, "r")
-            ret += "            for r in ret\n        ]\n"
-        else:
-            ret = f'        return {self._build_returned_value_recursive(schema, ret_type, 12, "ret", True)}'
-
-        return ret + "\n"
+            return (
+                "        return [\n"
+                + self._render_returned_value(ret_type, 12, "r")
+                + "            for r in ret\n        ]\n\n"
+            )
+        return "        return " + self._render_returned_value(ret_type, 12, "ret", True) + "\n"
 
-    def _get_function_implementation(self, path: str, get: Get, schema: Dict[str, Schema]) -> str:
-        ret = ""
+    def _get_function_implementation(self, path: str, get: Get) -> str:
+        parts = []
         if "parameters" in get:
-            ret += '        params = {}\n'
+            # The parameters that are always present (required, or optional
+            # with a default) go into one dict literal; only the truly
+            # optional ones need a guarded assignment afterwards. The
+            # emitted method builds its params dict in a single expression
+            # instead of one insertion per parameter
+            always_set = []
+            maybe_set = []
             for param in get["parameters"]:
-                if not param["required"]:
-                    if "default" in param["schema"]:
-                        ret += f'        params["{param["name"]}"] = {param["name"]}\n'
-                    else:
-                        ret += f'        if {param["name"]} is not None:\n'
-                        ret += f'            params["{param["name"]}"] = {param["name"]}\n'
+                if param["required"] or "default" in param["schema"]:
+                    always_set.append(param["name"])
                 else:
-                    ret += f'        params["{param["name"]}"] = {param["name"]}\n'
-            if self._is_async:
-                ret += f'        ret = await self._do_request("{path}", params)\n'
+                    maybe_set.append(param["name"])
+            if always_set:
+                parts.append('        params = {\n')
+                parts.append(",\n".join(f'            "{name}": {name}' for name in always_set))
+                parts.append('\n        }\n')
             else:
-                ret += f'        ret = self._do_request("{path}", params)\n'
+                parts.append('        params = {}\n')
+            # The guarded assignments are emitted as one joined block like
+            # the dict literal above, instead of two fragments per name
+            parts.append("".join(
+                f'        if {name} is not None:\n            params["{name}"] = {name}\n'
+                for name in maybe_set
+            ))
+            parts.append(f'        ret = {self._await_keyword}self._do_request("{path}", params)\n')
         else:
-            if self._is_async:
-                ret += f'        ret = await self._do_request("{path}")\n'
-            else:
-                ret += f'        ret = self._do_request("{path}")\n'
-        ret += self._build_returned_value(get, schema)
-        return ret
+            parts.append(f'        ret = {self._await_keyword}self._do_request("{path}")\n')
+        parts.append(self._build_returned_value(get))
+        return "".join(parts)
 
-    def _add_method(self, path: str, path_object: OpenAPIPath, schema: Dict[str, Schema]) -> str:
+    def _add_method(self, path: str, path_object: OpenAPIPath) -> str:
         get = path_object["get"]
         method_name = get_method_name(path)
-        ret = "    "
-        if self._is_async:
-            ret += "async "
-        
-        ret += f"def {method_name}(self{self._get_func_params(get)}) -> {self._get_response_type(get)}:\n"
-        ret += self._get_function_description(get, schema)
-        ret += self._get_function_implementation(path, get, schema)
-        return ret
-
-    def _write_main_class(self, to_write: str):
-        if self._is_async:
-            with open(os.path.join(self._result_folder, f"{self._class_name}.py"), "w+") as f:
-                f.write(to_write)
-        else:
-            with open(os.path.join(self._result_folder, f"{self._class_name}Sync.py"), "w+") as f:
-                f.write(to_write)
+        return "".join((
+            self._method_prefix,
+            f"{method_name}(self{self._get_func_params(get)}) -> {self._get_response_type(get)}:\n",
+            self._get_function_description(get),
+            self._get_function_implementation(path, get),
+        ))
 
     def _get_list_of_exceptions(self, schemas: Dict[str, Schema]) -> List[str]:
         """Get the list of each exception that we can possibly throw
@@ -871,28 +820,91 @@ class {self._class_name}Sync:
         """
         return [schema_name for schema_name in schemas if "Exception" in schema_name]
 
-    def _add_export_to_package(self):
+    def add_export_to_package(self):
         """Append to the __init__.py file in order to allow it to export the current module
+
+        This step is separate from generate_main_class so that the async and
+        sync generators can run in parallel while the export lines are still
+        appended in a deterministic order.
+        """
+        with open(self._init_path, "a") as f:
+            f.write(self._export_line)
+
+    def _warm_caches(self, paths: Dict[str, OpenAPIPath]):
+        """Populate the per-run caches with one pass over the paths.
+
+        The parameter partition, the schema name and the models to import
+        are all derived here once; the emission helpers then only read the
+        warm tables instead of deriving them combinatorially mid-emission.
+
+        :param paths: The paths of the OpenAPI file
+        :type paths: Dict[str, OpenAPIPath]
         """
-        with open(os.path.join(self._result_folder, "__init__.py"), "a") as f:
-            if self._is_async:
-                f.write(f'from .{self._class_name} import {self._class_name}\n')
+        models = []
+        seen = set()
+        has_list = False
+        for path_object in paths.values():
+            get = path_object["get"]
+            self._partition_params(get)
+            returned_schema = self._get_response_schema(get)
+            is_list = "items" in returned_schema
+            if is_list:
+                has_list = True
+            if is_list or "$ref" in returned_schema:
+                schema_to_add, _ = self._get_schema_name(get)
+                # The worklist walks the dependency graph depth-first so
+                # transitive dependencies (arrays of objects of objects)
+                # are imported too, each schema exactly once
+                stack = [schema_to_add]
+                while stack:
+                    name = stack.pop()
+                    if name not in seen:
+                        seen.add(name)
+                        models.append(name)
+                        stack.extend(reversed(self._get_depend_schemas(name)))
+            elif "type" in returned_schema:
+                # It can be a simple int, so nothing to import
+                self._get_schema_name(get)
             else:
-                f.write(f'from .{self._class_name}Sync import {self._class_name}Sync\n')
+                raise Exception(f"Not 'item' nor '$ref' in current returned schema: {returned_schema}")
+        self._models_to_import = models
+        self._has_list_flag = has_list
 
-    def generate_main_class(self, open_api_file: OpenAPI):
-        main_class_text = ""
-        exception_names = self._get_list_of_exceptions(open_api_file["components"]["schemas"])
-        main_class_text += self._add_necessary_imports(open_api_file["paths"], open_api_file["components"]["schemas"], exception_names)
-        exception_docs = self._get_exception_docs(exception_names, open_api_file["components"]["schemas"])
-        main_class_text += "\n"
-        if self._is_async:
-            main_class_text += self._add_class_begining(open_api_file["info"], exception_names, exception_docs)
-        else:
-            main_class_text += self._add_class_begining_sync(open_api_file["info"], exception_names, exception_docs)
-        main_class_text += "\n"
-        for path in open_api_file["paths"]:
-            main_class_text += self._add_method(path, open_api_file["paths"][path], open_api_file["components"]["schemas"])
+    def _clear_caches(self):
+        """Drop the per-run caches once the file is written.
+
+        The id-keyed caches must not outlive the parsed spec they were
+        built from, and the schema caches are only valid for the schemas
+        bound during the run.
+        """
+        self._depend_cache.clear()
+        self._schema_name_cache.clear()
+        self._example_cache.clear()
+        self._param_cache.clear()
+        self._rendered_value_cache.clear()
 
-        self._write_main_class(main_class_text)
-        self._add_export_to_package()
+    def generate_main_class(self, open_api_file: OpenAPI):
+        schemas = open_api_file["components"]["schemas"]
+        paths = open_api_file["paths"]
+        info = open_api_file["info"]
+        # The schemas dict is shared by almost every helper, so it is bound
+        # to the instance once instead of being threaded through the whole
+        # call stack and every recursion level
+        self._all_schemas = schemas
+        self._warm_caches(paths)
+        try:
+            exception_names = self._get_list_of_exceptions(schemas)
+            exception_docs = self._get_exception_docs(exception_names)
+            # The output is streamed to the file as it is rendered: the
+            # imports, then the class header, then one write per method.
+            # The buffered writer batches the syscalls and the whole file
+            # is never held as a single giant string
+            with open(self._out_path, "w+") as f:
+                f.write(self._add_necessary_imports(paths, exception_names))
+                f.write("\n")
+                f.write(self._add_class_begining_flavour(info, exception_names, exception_docs))
+                f.write("\n")
+                for path, path_object in paths.items():
+                    f.write(self._add_method(path, path_object))
+        finally:
+            self._clear_caches()
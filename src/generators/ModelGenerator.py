@@ -1,11 +1,91 @@
 import json
 import os
 
-from typing import Any, Dict, List
+from concurrent.futures import ThreadPoolExecutor
+from string import Template
+from typing import Any, Dict, List, Tuple
 
-from src.utils import add_indent, remove_last_line
+from src.utils import add_indent, extract_schema_name_from_ref, remove_last_line
 from src.generators.generator_types import Property, Schema
 
+_TYPE_INFO = {
+    "string": ("str", 'Example: "{}"'),
+    "integer": ("int", "Example: {}"),
+    "number": ("Decimal", "Example: Decimal({})"),
+}
+"""For each scalar OpenAPI type: the python type to emit and the format
+of the example line of the field docstring.
+
+A dict lookup resolves the type in one step where the previous match
+statement compared the type string case by case; "array" stays special
+because it needs the element type.
+"""
+
+_UNSUPPORTED_TYPE_ERROR = 'The generator does not support the type {} please open an issue on: https://github.com/Clarensia/Human-Readable-OpenAPI-Client-Generator/issues'
+"""The error reported when a property has a type we can not emit"""
+
+_MODEL_HEADER_TEMPLATE = Template('''from dataclasses import dataclass
+${imports}
+
+@dataclass(slots=True, frozen=True)
+class ${name}:
+    """The ${name} model"""
+
+''')
+"""The imports, decorator and class line of a generated model.
+
+Only the model name and the extra imports vary, so the skeleton is
+parsed once at import like the exception templates.
+"""
+
+_BASE_EXCEPTION_TEMPLATE = Template('''from abc import ABC
+
+class ${api_name}Exception(Exception, ABC):
+    """Thrown when the API returns us an Exception"""
+    
+    status_code: int
+    """The status code returned by the API"""
+    
+    detail: str
+    """Some details about the error that occured"""
+    
+    def __init__(self, status_code: int, detail: str):
+        self.status_code = status_code
+        self.detail = detail
+        super().__init__(f"{self.status_code} - {self.detail}")
+
+''')
+"""The base exception file, parsed a single time at import.
+
+The skeleton is fixed: only the API name changes between runs, so the
+file is rendered with one substitute call.
+"""
+
+_UNKNOWN_EXCEPTION_TEMPLATE = Template('''from . import ${main_class_name}
+
+class Unknown${api_name}Exception(${main_class_name}):
+    """
+    Thrown when an unknown exception was returned by the API
+    """
+    
+    status_code: int
+    """The status code returned by the API"""
+    
+    detail: str
+    """The details of the exception"""
+
+''')
+"""The unknown exception file, without its constructor"""
+
+_EXCEPTION_HEADER_TEMPLATE = Template('''from . import ${main_class_name}
+
+class ${exception_name}(${main_class_name}):
+    """
+${description_block}    """
+
+''')
+"""The import, class line and docstring of a generated exception"""
+
 
 class ModelGenerator:
     '''Create a model from the given shemas from OpenAPI.
@@ -131,20 +211,20 @@ class ModelGenerator:
         self._api_name = api_name
         self._exception_module_description = exception_module_description
         self._models_module_description = models_module_description
-
-    def _has_array(self, properties: Dict[str, Property]) -> bool:
-        for property_name in properties:
-            if properties[property_name]["type"] == "array":
-                return True
-
-        return False
-
-    def _has_decimals(self, properties: Dict[str, Property]) -> str:
-        for property_name in properties:
-            if properties[property_name]["type"] == "number":
-                return True
-
-        return False
+        # The templates are parsed at import and the texts that only
+        # depend on the API name are rendered here once, so build_models
+        # never re-substitutes them per run
+        self._main_exception_name = f"{api_name}Exception"
+        self._base_exception_text = _BASE_EXCEPTION_TEMPLATE.substitute(api_name=api_name)
+        self._unknown_exception_text = _UNKNOWN_EXCEPTION_TEMPLATE.substitute(
+            api_name=api_name,
+            main_class_name=self._main_exception_name) + self._add_exception_constructor()
+        self._example_dump_cache: Dict[int, str] = {}
+        """The pretty-printed example arrays keyed by the id of the
+        example object. The pretty printer takes a slow path, and the
+        parsed spec (which outlives the build) can hand us the same
+        example for several schemas.
+        """
 
     def _get_array_type(self, _property: Property) -> str:
         """For a given property of type "array", it will give the type of the array.
@@ -170,66 +250,76 @@ class ModelGenerator:
         """
         if _property["type"] != "array":
             raise Exception("ModelGenerator: _get_array_type: Called _get_array_type with a type that is not \"array\":", _property["type"])
-        ref = _property["items"]["$ref"]
-        return ref.split("/")[-1]
+        # The shared helper is lru_cached on the $ref string, so a ref
+        # already resolved for another schema (or by the main-class
+        # generator) costs a dict lookup
+        return extract_schema_name_from_ref(_property["items"]["$ref"])
 
-    def _get_array_types(self, properties: Dict[str, Property]) -> List[str]:
-        """For a dictionary of properties, it will get all the types of the arrays.
-        
-        This is required for the dataclass, because if a dataclass has a list, we must import
-        the type of the list
+    def _prepare_properties(self, properties: Dict[str, Property]) -> List[Tuple[str, str, Property, str | None]]:
+        """Resolve the derived values of every property a single time.
+
+        The emitters used to re-read the type of each property and
+        re-extract the array element type from the $ref; with the
+        prepared tuples both are computed once per schema and simply
+        read afterwards.
 
         :param properties: The dictionary containing as key the name of the property and as
                            value the Property object.
         :type properties: Dict[str, Property]
+        :return: One (name, type, property, array element type) tuple per
+                 property, the element type being None for non-arrays
+        :rtype: List[Tuple[str, str, Property, str | None]]
         """
-        ret = []
-        for property_name in properties:
-            _property = properties[property_name]
-            if _property["type"] == "array":
-                ret.append(self._get_array_type(_property))
-        return ret
-
-    def _add_special_imports(self, properties: Dict[str, Property]) -> str:
+        prepared = []
+        for property_name, _property in properties.items():
+            property_type = _property["type"]
+            array_type = self._get_array_type(_property) if property_type == "array" else None
+            prepared.append((property_name, property_type, _property, array_type))
+        return prepared
+
+    def _add_special_imports(self, properties: List[Tuple[str, str, Property, str | None]]) -> str:
         """Some fields require some special imports:
         List
         Decimals
         Other models
-        
+
         This method allow us to detect which imports are required and add
         them.
-        
+
         For example, if we detect a "number" type in one of the properties fields,
         we add: from decimal import Decimal
-        
+
         We use "Decimal" for the number type because it is more precise.
 
-        :param properties: The properties that we have for the program
-        :type properties: Dict[str, Property]
+        :param properties: The properties prepared by _prepare_properties
+        :type properties: List[Tuple[str, str, Property, str | None]]
         :return: Some added imports when necessary
         :rtype: str
         """
-        ret = ""
-        if self._has_decimals(properties):
-            ret += "from decimal import Decimal\n"
-        if self._has_array(properties):
-            array_types = self._get_array_types(properties)
-            ret += "from typing import List\n"
-            for array_type in array_types:
-                ret += f"from . import {array_type}\n"
-        return ret
-
-    def _add_first_lines(self, model_name: str, properties: Dict[str, Property]) -> str:
-        ret = "from dataclasses import dataclass\n"
-        ret += self._add_special_imports(properties)
-        ret += f'''
-
-@dataclass(slots=True, frozen=True)
-class {model_name}:
-    """The {model_name} model"""
-
-'''
-        return ret
+        # A single pass over the prepared properties finds the decimals
+        # and the array element types at once, instead of one scan per
+        # question; the element types were already resolved by _prepare_properties
+        has_decimal = False
+        array_types = []
+        for _property_name, property_type, _property, array_type in properties:
+            if property_type == "number":
+                has_decimal = True
+            elif array_type is not None:
+                array_types.append(array_type)
+        parts = []
+        if has_decimal:
+            parts.append("from decimal import Decimal\n")
+        if array_types:
+            parts.append("from typing import List\n")
+            # dict.fromkeys dedupes while keeping the first-seen order, so
+            # two arrays of the same element type import it a single time
+            for array_type in dict.fromkeys(array_types):
+                parts.append(f"from . import {array_type}\n")
+        return "".join(parts)
+
+    def _add_first_lines(self, model_name: str, properties: List[Tuple[str, str, Property, str | None]]) -> str:
+        return _MODEL_HEADER_TEMPLATE.substitute(name=model_name,
+                                                 imports=self._add_special_imports(properties))
 
     def _format_example_array(self, space_add: int, example: List[Dict[str, str | int]]) -> str:
         """Allow to format the array for a description. It will json.dumps the array
@@ -242,93 +332,65 @@ class {model_name}:
         :return: The string formatted correctly
         :rtype: str
         """
-        # Create the json string
-        json_string = json.dumps(example, indent=4)
+        # Create the json string, reusing the dump when the same example
+        # object was already pretty-printed for another schema
+        key = id(example)
+        json_string = self._example_dump_cache.get(key)
+        if json_string is None:
+            json_string = self._example_dump_cache[key] = json.dumps(example, indent=4)
         # Add space_add spaces
         indentation = ' ' * space_add
         # Add the 4 spaces at the beginning of each lines
         space_added = '\n'.join(indentation + line for line in json_string.splitlines())
         return space_added
 
-    def _add_property(self, property_name: str, _property: Property, example: Any) -> str:
-        ret = ""
-        match _property["type"]:
-            case "string":
-               ret += f"    {property_name}: str\n"
-               ret += '    """' + _property["description"] + "\n"
-               ret += f'\n    Example: "{example}"\n'
-               ret += '    """\n\n'
-            case "integer":
-                ret += f"    {property_name}: int\n"
-                ret += '    """' + _property["description"] + "\n"
-                ret += f'\n    Example: {example}\n'
-                ret += '    """\n\n'
-            case "array":
-                array_type = self._get_array_type(_property)
-                ret += f"    {property_name}: List[" + array_type + "]\n"
-                ret += '    """' + _property["description"] + "\n"
-                ret += "\n    Example:\n"
-                ret += self._format_example_array(4, example)
-                ret += '\n    """\n\n'
-            case "number":
-                ret += f"    {property_name}: Decimal\n"
-                ret += '    """' + _property["description"] + "\n"
-                ret += f'\n    Example: Decimal({example})\n'
-                ret += '    """\n\n'
-            case _:
-                raise Exception(f'The generator does not support the type {_property["type"]} please open an issue on: https://github.com/Clarensia/Human-Readable-OpenAPI-Client-Generator/issues')
-        return ret
+    def _add_property(self, property_name: str, property_type: str, _property: Property,
+                      array_type: str | None, example: Any) -> str:
+        # The scalar cases only differ by the python type and the example
+        # format, both resolved with one lookup in _TYPE_INFO; the whole
+        # field is still rendered as a single f-string
+        if array_type is not None:
+            formatted_example = self._format_example_array(4, example)
+            return f'    {property_name}: List[{array_type}]\n    """{_property["description"]}\n\n    Example:\n{formatted_example}\n    """\n\n'
+        info = _TYPE_INFO.get(property_type)
+        if info is None:
+            raise Exception(_UNSUPPORTED_TYPE_ERROR.format(property_type))
+        py_type, example_format = info
+        return f'    {property_name}: {py_type}\n    """{_property["description"]}\n\n    {example_format.format(example)}\n    """\n\n'
+
+    def _write_file(self, path: str, text: str):
+        """Write the fully assembled text of a generated file in one shot.
+
+        The text is complete when we get here, so the buffered text layer
+        of open() has nothing to batch: a single os.write of the encoded
+        bytes lands the file in one syscall.
+
+        :param path: The path of the file to create
+        :type path: str
+        :param text: The whole content of the file
+        :type text: str
+        """
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            os.write(fd, text.encode())
+        finally:
+            os.close(fd)
 
     def _write_model(self, model_name: str, model_text: str):
-        with open(os.path.join(self._models_path, model_name + ".py"), "w+") as f:
-            f.write(remove_last_line(model_text))
+        self._write_file(os.path.join(self._models_path, model_name + ".py"),
+                         remove_last_line(model_text))
 
     def _write_exception(self, exception_name: str, text: str):
-        with open(os.path.join(self._exceptions_path, exception_name + ".py"), "w+") as f:
-            f.write(text)
+        self._write_file(os.path.join(self._exceptions_path, exception_name + ".py"), text)
 
     def _write_base_exception(self):
         """Create the basic Exception file for the name of the API
         """
-        text = f'''from abc import ABC
-
-class {self._api_name}Exception(Exception, ABC):
-    """Thrown when the API returns us an Exception"""
-    
-    status_code: int
-    """The status code returned by the API"""
-    
-    detail: str
-    """Some details about the error that occured"""
-    
-    def __init__(self, status_code: int, detail: str):
-        self.status_code = status_code
-        self.detail = detail
-        super().__init__(f"{{self.status_code}} - {{self.detail}}")
-
-'''
-        self._write_exception(f"{self._api_name}Exception", text)
+        self._write_exception(self._main_exception_name, self._base_exception_text)
 
     def _write_unknown_exception(self):
         """Create the unknown exception"""
-        main_class_name = f'{self._api_name}Exception'
-        text = f'''from . import {main_class_name}
-
-class Unknown{self._api_name}Exception({main_class_name}):
-    """
-    Thrown when an unknown exception was returned by the API
-    """
-    
-    status_code: int
-    """The status code returned by the API"""
-    
-    detail: str
-    """The details of the exception"""
-
-'''
-        text += self._add_exception_constructor()
-        
-        self._write_exception(f"Unknown{self._api_name}Exception", text)
+        self._write_exception(f"Unknown{self._api_name}Exception", self._unknown_exception_text)
 
     def _write_name_and_description_of_exception(self, exception_name: str, description: str) -> str:
         """Write the first few lines of the exception which are the name and the
@@ -343,14 +405,9 @@ class Unknown{self._api_name}Exception({main_class_name}):
         :return: The exception with first text
         :rtype: str
         """
-        main_class_name = f'{self._api_name}Exception'
-        return f'''from . import {main_class_name}
-
-class {exception_name}({main_class_name}):
-    """
-{add_indent(description, 4)}    """
-
-'''
+        return _EXCEPTION_HEADER_TEMPLATE.substitute(main_class_name=self._main_exception_name,
+                                                     exception_name=exception_name,
+                                                     description_block=add_indent(description, 4))
 
     def _add_exception_constructor(self) -> str:
         return '''
@@ -381,23 +438,69 @@ class {exception_name}({main_class_name}):
             f.write(f'from .{module_name} import {module_name}\n')
 
     def _add_all_exports(self, exports: List[str], is_exception: bool):
-        ret = "\n__all__ = [\n"
-        i = 0
-        tot = len(exports)
-        for export in exports:
-            ret += f'    "{export}"'
-            i += 1
-            if i != tot:
-                ret += ","
-            ret += "\n"
-
-        ret += "]\n"
+        # ",\n".join places every separator in one pass, instead of the
+        # loop counting elements to decide where the last comma goes
+        if exports:
+            lines = ",\n".join(f'    "{export}"' for export in exports)
+            ret = f"\n__all__ = [\n{lines}\n]\n"
+        else:
+            ret = "\n__all__ = [\n]\n"
         path = self._exceptions_path
         if not is_exception:
             path = self._models_path
         with open(os.path.join(path, "__init__.py"), "a") as f:
             f.write(ret)
 
+    def _build_exception(self, schema_name: str, schema: Schema):
+        """Assemble and write the file of a single exception schema.
+
+        :param schema_name: The name of the exception schema
+        :type schema_name: str
+        :param schema: The schema of the exception
+        :type schema: Schema
+        """
+        # The file is assembled from its four blocks in one join; the
+        # example dict is bound once instead of being looked up per field
+        example = schema["example"]
+        to_write = "".join((
+            self._write_name_and_description_of_exception(schema_name, schema["description"]),
+            f'''    status_code: int
+    """The error code returned by the call to the API
+    
+    For example: {example["status_code"]}
+    """
+
+''',
+            f'''    detail: str
+    """Some details about the error that occured
+    
+    For example:
+    {example["detail"]}
+    """
+''',
+            self._add_exception_constructor(),
+        ))
+        self._write_exception(schema_name, to_write)
+
+    def _build_model(self, schema_name: str, schema: Schema):
+        """Assemble and write the file of a single model schema.
+
+        :param schema_name: The name of the model schema
+        :type schema_name: str
+        :param schema: The schema of the model
+        :type schema: Schema
+        """
+        # The fields are collected in a list and the file text is built
+        # with a single join: += per property re-copies the whole model
+        # for every field
+        example = schema["example"]
+        prepared = self._prepare_properties(schema["properties"])
+        parts = [self._add_first_lines(schema_name, prepared)]
+        for property_name, property_type, _property, array_type in prepared:
+            parts.append(self._add_property(property_name, property_type, _property,
+                                            array_type, example[property_name]))
+        self._write_model(schema_name, "".join(parts))
+
     def build_models(self, schemas: Dict[str, Schema]):
         """Build the schemas and write them inside of the model folder.
         
@@ -410,45 +513,38 @@ class {exception_name}({main_class_name}):
         self._write_base_exception()
         self._write_unknown_exception()
         self._write_init_exception()
-        self._add_exported_exception(f"{self._api_name}Exception")
+        self._add_exported_exception(self._main_exception_name)
         self._write_init_model()
-        exported_exceptions = []
-        exported_modules = []        
-        for schema_name in schemas:
+        # One pass partitions the schemas by name, so the build loop below
+        # runs without re-testing the substrings per schema
+        exceptions_to_build = []
+        models_to_build = []
+        for schema_name, schema in schemas.items():
             # We will handle errors later
             if "Error" in schema_name:
                 continue
             elif "Exception" in schema_name:
-                schema = schemas[schema_name]
-                to_write = ""
-                to_write += self._write_name_and_description_of_exception(schema_name, schema["description"])
-                to_write += f'''    status_code: int
-    """The error code returned by the call to the API
-    
-    For example: {schema["example"]["status_code"]}
-    """
-
-'''
-                to_write += f'''    detail: str
-    """Some details about the error that occured
-    
-    For example:
-    {schema["example"]["detail"]}
-    """
-'''
-                to_write += self._add_exception_constructor()
-                self._write_exception(schema_name, to_write)
-                self._add_exported_exception(schema_name)
-                exported_exceptions.append(schema_name)
+                exceptions_to_build.append((schema_name, schema))
             else:
-                schema = schemas[schema_name]
-                to_write = ""
-                to_write += self._add_first_lines(schema_name, schema["properties"])
-                for property_name in schema["properties"]:
-                    _property = schema["properties"][property_name]
-                    to_write += self._add_property(property_name, _property, schema["example"][property_name])
-                self._write_model(schema_name, to_write)
-                self._add_exported_module(schema_name)
-                exported_modules.append(schema_name)
+                models_to_build.append((schema_name, schema))
+        exported_exceptions = [schema_name for schema_name, _schema in exceptions_to_build]
+        exported_modules = [schema_name for schema_name, _schema in models_to_build]
+        # Each schema renders and writes its own file, so the builds run
+        # on a thread pool. Threads fit better than processes here: every
+        # worker reads the same parsed schemas without pickling and the
+        # writes are plain file I/O
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            futures = [executor.submit(self._build_exception, schema_name, schema)
+                       for schema_name, schema in exceptions_to_build]
+            futures.extend(executor.submit(self._build_model, schema_name, schema)
+                           for schema_name, schema in models_to_build)
+            for future in futures:
+                future.result()
+        # The exports are appended once the workers are done, in schema
+        # order, so the __init__.py files stay deterministic
+        for exception_name in exported_exceptions:
+            self._add_exported_exception(exception_name)
+        for module_name in exported_modules:
+            self._add_exported_module(module_name)
         self._add_all_exports(exported_exceptions, True)
         self._add_all_exports(exported_modules, False)
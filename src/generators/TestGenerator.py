@@ -180,24 +180,6 @@ class Test{method_name[0].upper() + method_name[1:]}({helper_name}):
 
         return ret
 
-    def _get_all_optional_parameters(self, get: Get) -> Dict[str, str | int]:
-        """Get all of the optional parameters
-
-        :param get: The get of the path
-        :type get: Get
-        :return: The optional parameter as key and as value its example/default value
-        :rtype: Dict[str, str | int]
-        """
-        all_params = {}
-        for parameter in get["parameters"]:
-            if not parameter["required"]:
-                if "example" in parameter:
-                    all_params[parameter["name"]] = parameter["example"]
-                else:
-                    all_params[parameter["name"]] = parameter["schema"]["default"]
-                    
-        return all_params
-
     def _get_all_combinations(self, all_options: Dict[str, str | int]) -> List[Dict[str, str | int]]:
         """Get the combination of all of the key-value possible
 
@@ -255,12 +237,19 @@ class Test{method_name[0].upper() + method_name[1:]}({helper_name}):
         else:
             ret = {}
             required_params = {}
+            all_options = {}
+            # One pass splits the parameters: the required ones keep their
+            # example, the optional ones fall back to their default when no
+            # example is given
             for parameter in get["parameters"]:
                 if parameter["required"]:
                     required_params[parameter["name"]] = parameter["example"]
-            
+                elif "example" in parameter:
+                    all_options[parameter["name"]] = parameter["example"]
+                else:
+                    all_options[parameter["name"]] = parameter["schema"]["default"]
+
             ret["only_required"] = required_params
-            all_options = self._get_all_optional_parameters(get)
             all_combinations = self._get_all_combinations(all_options)
             for combination in all_combinations:
                 to_add = {**required_params, **combination}
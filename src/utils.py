@@ -1,12 +1,26 @@
 import re
 
+from functools import lru_cache
 
+_CAMEL_BOUNDARY_FIRST = re.compile('(.)([A-Z][a-z]+)')
+"""First camel-case boundary used by get_method_name, compiled once at
+import time
+"""
+
+_CAMEL_BOUNDARY_SECOND = re.compile('([a-z0-9])([A-Z])')
+"""Second camel-case boundary used by get_method_name"""
+
+
+@lru_cache
 def convert_type(give_type: str) -> str:
     """Convert a type from OpenAPI to a python type.
-    
+
     * "integer" -> "int"
     * "string" -> "str"
 
+    The conversion is called for every parameter of every path, always
+    with the same handful of JSON type strings, so the result is cached.
+
     :param give_type: The type in OpenAPI
     :type give_type: str
     :return: The type in python
@@ -32,22 +46,30 @@ def is_native_python_type(schema_name: str) -> bool:
     """
     return schema_name == "int" or schema_name == "str"
 
+@lru_cache
 def extract_schema_name_from_ref(ref: str) -> str:
     """Extract the schema name from a certain $ref value
-    
+
     For example:
     "#/components/schemas/Exchanges" -> "Exchange"
 
+    The same few $ref strings come back for every endpoint that uses a
+    schema, so the split is cached.
+
     :param ref: The $ref value of the schema
     :type ref: str
     :return: The name extracted
     :rtype: str
     """
-    return ref.split("/")[-1]
+    return ref.rpartition("/")[2]
 
+@lru_cache
 def get_method_name(path: str) -> str:
     """Get the name of the given method from the path.
-    
+
+    The result is cached because the async and sync generators both
+    convert the same paths, so each path pays the regex work only once.
+
     It simply, split the path by the '/' character and then returns:
     - splited[-1] if the path did not end up by a '/'
     - splited[-2] if the path did end by a '/'
@@ -68,8 +90,8 @@ def get_method_name(path: str) -> str:
         ret = splited[-2]
     else:
         ret = splited[-1]
-    ret = re.sub('(.)([A-Z][a-z]+)', r'\1_\2', ret)
-    return re.sub('([a-z0-9])([A-Z])', r'\1_\2', ret).lower()
+    ret = _CAMEL_BOUNDARY_FIRST.sub(r'\1_\2', ret)
+    return _CAMEL_BOUNDARY_SECOND.sub(r'\1_\2', ret).lower()
 
 def add_indent(text: str, indent: int, except_first_line: bool = False) -> str:
     """Add indent spaces after each new lines of text